@@ -1,13 +1,33 @@
 # coding: utf-8
+import collections
+import io
+import itertools
+import multiprocessing
+import string
 import types
+import warnings
 
 import cairo
 import numpy as np
-import pandas as pd
 import pango
 import pangocairo
 import pint
 
+from .aio import (AsyncRenderer, render_batch_async,
+                  render_frame_text_async, render_text_async)
+from .fit import (MAX_FONT_SIZE, FontSolution, _fit_cache_key, _get_fit,
+                  _put_fit, _recent_fit_key, _recent_fits, clear_fit_cache,
+                  configure_fit_cache, fit_cache_info, solve_font_size)
+from .frame import format_column, format_frame
+from .glyphs import GlyphAdvanceTable, estimate_extents, get_glyph_table
+from .measure import (MeasurementContext, TextExtents, _apply_linear_metrics,
+                      _linear_font_options, _resolve_linear,
+                      clear_extent_cache, configure_extent_cache,
+                      extent_cache_info, get_linear_metrics,
+                      get_measurement_context, measure_many,
+                      release_measurement_context, set_linear_metrics)
+from .table import (TableLayout, _candidates, allocate_column_widths,
+                    draw_table, layout_table)
 from ._version import get_versions
 __version__ = get_versions()['version']
 del get_versions
@@ -16,7 +36,33 @@ del get_versions
 UREG = pint.UnitRegistry()
 
 
-def text_size(text, font='Serif 12'):
+def _to_pixels(value):
+    '''
+    Returns
+    -------
+    float or None
+        :data:`value` in pixels (if specified as a :class:`UREG.Quantity`),
+        or :data:`value` as is.
+
+    Notes
+    -----
+    Safe to call from multiple threads without a lock: the caches of the
+    unit registry are built when it is created, and a conversion only
+    reads them (or adds the same entry each time, as a single dictionary
+    assignment, which is atomic under the GIL).  Defining units while
+    rendering from other threads is *not* safe.
+    '''
+    if isinstance(value, UREG.Quantity):
+        return value.to('pixel').magnitude
+    return value
+
+
+# Convert once (e.g., to parse and cache the pixel unit), so conversions while
+# rendering only read the caches of the unit registry.
+_to_pixels(1 * UREG.pixel)
+
+
+def text_size(text, font='Serif 12', context=None, linear=None):
     '''
     Parameters
     ----------
@@ -25,6 +71,16 @@ def text_size(text, font='Serif 12'):
 
         If a list is provided, calculate the rendered size of each entry in the
         list.
+    context : MeasurementContext, optional
+        Measurement context to lay out text with.
+
+        If not specified, use the measurement context of the calling thread
+        (see :func:`get_measurement_context`).
+    linear : bool, optional
+        If ``True``, measure text in linear metrics mode (see
+        :func:`set_linear_metrics`).  Ignored if :data:`context` is specified.
+
+        If not specified, use the default linear metrics mode.
 
     Returns
     -------
@@ -35,6 +91,10 @@ def text_size(text, font='Serif 12'):
         If :data:`text` is list-like, return Pandas data frame containing
         ``width`` and ``height`` columns, with each row indexed by the
         corresponding text string.
+
+    See also
+    --------
+    :func:`measure_many`
     '''
     if isinstance(font, types.StringTypes):
         font = pango.FontDescription(font)
@@ -45,34 +105,31 @@ def text_size(text, font='Serif 12'):
     else:
         singleton = False
 
-    # Create temporary cairo surface (required for Pango to draw to).
-    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, 1000, 1000)
-    context = cairo.Context(surface)
-    pangocairo_context = pangocairo.CairoContext(context)
-    pangocairo_context.set_antialias(cairo.ANTIALIAS_DEFAULT)
-
-    def _get_text_layout(text):
-        layout = pangocairo_context.create_layout()
-        layout.set_font_description(font)
-        layout.set_text(text)
-        return layout
-
-    def _get_text_size(text):
-        layout = _get_text_layout(text)
-        return np.array(layout.get_size(), dtype=float) / pango.SCALE
-
-    df_text_sizes = pd.DataFrame(map(_get_text_size, text),
-                                 columns=['width', 'height'], index=text)
+    extents = measure_many(text, font, context=context, linear=linear)
+    df_text_sizes = extents.to_frame()
     if singleton:
         return df_text_sizes.iloc[0]
     else:
         return df_text_sizes
 
 
+def _pixel_to_pt_scale(text, font, linear=None):
+    '''
+    Returns
+    -------
+    numpy.array
+        Ratios of ``(width, height)`` from pixels to pt.
+    '''
+    return get_glyph_table(font, linear).estimate(text, 1).max()
+
+
 def pixel_to_pt_scale(text, font='Serif'):
     '''
     Estimate the number of pixels/pt for width and height.
 
+    The estimate is computed from the glyph advances of the font (see
+    :class:`GlyphAdvanceTable`), without laying out each line of text.
+
     Parameters
     ----------
     text : str or list-like
@@ -84,27 +141,92 @@ def pixel_to_pt_scale(text, font='Serif'):
         Pandas series containing ``width`` and ``height`` ratios from pixels to
         pt.
     '''
+    import pandas as pd
+
     if isinstance(font, types.StringTypes):
         font = pango.FontDescription(font)
-    else:
-        font = font.copy()
 
     if isinstance(text, types.StringTypes):
         text = [text]
 
-    # Test with a nominal font size to compute relative scale of rendered text
-    # of UUID.
-    # XXX If this test font size is too small (e.g., 1 or 2), it can lead to
-    # scaling errors.  Here we use 12.
-    test_size = 12
-    font.set_size(test_size * pango.SCALE)
-    df_sizes = text_size(text, font)
-    dpixel_dpt = df_sizes.max() / test_size
-    return dpixel_dpt
+    return pd.Series(_pixel_to_pt_scale(text, font), index=['width',
+                                                            'height'])
+
+
+def _fit_text(text, font='Serif 12', width=None, height=None,
+              line_spacing=1.5, linear=None, hint=None):
+    '''
+    Fit the specified text based on the specified font, width, and height.
+
+    Same as :func:`fit_text`, but return fitted text dimensions as
+    :class:`TextExtents`.
+    '''
+    if isinstance(text, types.StringTypes):
+        text = [text]
+    text = list(text)
+
+    font = (pango.FontDescription(font)
+            if isinstance(font, types.StringTypes)
+            else font.copy())
+
+    if width is None and height is None:
+        if font.get_size() == 0:
+            raise ValueError('Font size must be given if neither `width` nor '
+                             '`height` is specified.')
+        return font, measure_many(text, font, linear=linear)
+
+    linear = _resolve_linear(linear)
+    key = _fit_cache_key(text, font, width, height, line_spacing, linear)
+    fit = _get_fit(key, text)
+    if fit is not None:
+        font.set_size(fit[0])
+        return font, fit[1]
+
+    # Estimate size of each line per pt (without laying out each line).
+    estimates = get_glyph_table(font, linear).estimate(text, 1)
+    dpixel_dpt = estimates.max()
+
+    # Estimate font size (in pt) from the pixel/pt scale of the text, and
+    # limit the height of each line (in pixels) to fit `height`.
+    line_height = None
+    if width is not None:
+        font_size = width / dpixel_dpt[0]
+    if height is not None:
+        line_height = height / (len(text) * line_spacing)
+        height_font_size = line_height / dpixel_dpt[1]
+        if width is None or height_font_size < font_size:
+            font_size = height_font_size
+
+    # Warm start from the hint or, if no hint is given, from the most recent
+    # solution for the same font and box (e.g., the previous label in a
+    # batch).
+    recent_key = _recent_fit_key(text, font, width, height, line_spacing,
+                                 linear)
+    if hint is None:
+        hint_size = _recent_fits.get(recent_key)
+    else:
+        hint_size = int(hint * pango.SCALE)
+
+    if hint_size is None:
+        solution = solve_font_size(text, font, width=width,
+                                   height=line_height,
+                                   size=int(font_size * pango.SCALE),
+                                   estimates=estimates, linear=linear)
+    else:
+        # Hint is checked first, and otherwise the solution is predicted from
+        # the sizes measured at the hint.
+        solution = solve_font_size(text, font, width=width,
+                                   height=line_height, size=hint_size,
+                                   estimates=estimates, predict=False,
+                                   linear=linear)
+    font.set_size(solution.size)
+    _recent_fits.put(recent_key, solution.size)
+    _put_fit(key, solution.size, solution.extents)
+    return font, solution.extents
 
 
 def fit_text(text, font='Serif 12', width=None, height=None,
-             line_spacing=1.5):
+             line_spacing=1.5, linear=None, hint=None):
     '''
     Fit the specified text based on the specified font, width, and height.
 
@@ -120,6 +242,20 @@ def fit_text(text, font='Serif 12', width=None, height=None,
         Height to fit text into.
     line_spacing : float, optional
         Line height relative to maximum text height.
+    linear : bool, optional
+        If ``True``, fit text in linear metrics mode (see
+        :func:`set_linear_metrics`), where the font size is computed directly
+        from a single measurement of the text.
+
+        If not specified, use the default linear metrics mode.
+    hint : float, optional
+        Font size (in pt) expected to be close to the fitted size (e.g., the
+        fitted size of a similar label), used as the starting point to search
+        for the fitted size.
+
+        If not specified, start from the most recent fitted size for the same
+        font, number of lines, width, height, and line spacing (if any), or
+        otherwise from an estimate based on the glyph advances of the font.
 
     Returns
     -------
@@ -127,57 +263,144 @@ def fit_text(text, font='Serif 12', width=None, height=None,
         The font description (including font size) and a Pandas data frame
         containing ``width`` and ``height`` columns of the fitted text
         dimensions, where each row is indexed by the corresponding text string.
+
+        If :data:`width` and/or :data:`height` is specified, the font size is
+        the largest size (to a resolution of one Pango unit) at which the text
+        fits (see :func:`solve_font_size`).
+
+        Results are cached (see :func:`configure_fit_cache`), so fitting the
+        same text into the same box again does not measure any text.
     '''
-    if isinstance(text, types.StringTypes):
-        text = [text]
+    font, extents = _fit_text(text, font=font, width=width, height=height,
+                              line_spacing=line_spacing, linear=linear,
+                              hint=hint)
+    return font, extents.to_frame()
 
-    font = (pango.FontDescription(font)
-            if isinstance(font, types.StringTypes)
-            else font.copy())
 
-    dpixel_dpt = pixel_to_pt_scale(text, font=font)
+def _draw_lines(context, pangocairo_context, font, lines, width, line_height,
+                align='left', linear=False):
+    '''
+    Draw lines of text, one below the other, starting at the current origin of
+    :data:`context`, using the current source color.
 
-    font_size = None
+    A single layout is reused for all lines, and each line is aligned within
+    :data:`width` based on its laid out size, so no separate measurement is
+    required.
+    '''
+    layout = pangocairo_context.create_layout()
+    if linear:
+        _apply_linear_metrics(layout)
+    layout.set_font_description(font)
+    for line_i in lines:
+        layout.set_text(line_i)
+        context.save()
+        if align in ('center', 'right'):
+            slack_i = width - layout.get_size()[0] / float(pango.SCALE)
+            context.translate(.5 * slack_i if align == 'center' else slack_i,
+                              0)
+        pangocairo_context.update_layout(layout)
+        pangocairo_context.show_layout(layout)
+        context.restore()
+        context.translate(0, line_height)
 
-    def _width():
-        return dpixel_dpt.width * font_size
 
-    def _height():
-        return dpixel_dpt.height * len(text) * line_spacing * font_size
+def _draw_text_block(context, pangocairo_context, font, lines, width,
+                     line_height, natural_height, align='left', linear=False):
+    '''
+    Draw lines of text as a single Pango layout, starting at the current
+    origin of :data:`context`, using the current source color.
 
-    if width is None and height is None:
-        if font.get_size() == 0:
-            raise ValueError('Font size must be given if neither `width` nor '
-                             '`height` is specified.')
-        font_size = font.get_size() / pango.SCALE
-        width = _width()
-        height = _height()
-    elif width is not None and height is not None:
-        font_size = int((width / dpixel_dpt).width)
-        if _height() > height:
-            font_size = np.ceil(height / (dpixel_dpt.height * len(text)
-                                          * line_spacing))
-    elif width is not None:
-        font_size = int((width / dpixel_dpt).width)
-        height = _height()
-    elif height is not None:
-        font_size = int((height / (len(text) * line_spacing
-                                   * dpixel_dpt.height)))
-        width = _width()
-
-    font.set_size(int(font_size * pango.SCALE))
-    df_sizes = text_size(text, font=font)
-
-    while ((df_sizes.max().width / width) > 1 or
-           (len(text) * line_spacing * df_sizes.max().height / height) > 1):
-        font_size = 0.99 * font_size
-        font.set_size(int(font_size * pango.SCALE))
-        df_sizes = text_size(text, font=font)
-    return font, df_sizes
+    Pango line spacing is set so that consecutive lines are
+    :data:`line_height` apart (given the :data:`natural_height` of each line),
+    and Pango alignment is used to align lines within :data:`width`.
+    '''
+    layout = pangocairo_context.create_layout()
+    if linear:
+        _apply_linear_metrics(layout)
+    layout.set_font_description(font)
+    layout.set_spacing(int(round((line_height - natural_height) *
+                                 pango.SCALE)))
+    if align in ('center', 'right'):
+        layout.set_width(int(width * pango.SCALE))
+        layout.set_alignment(pango.ALIGN_CENTER if align == 'center' else
+                             pango.ALIGN_RIGHT)
+    layout.set_text('\n'.join(lines))
+    pangocairo_context.update_layout(layout)
+    pangocairo_context.show_layout(layout)
+
+
+def _render_fitted(font, extents, width=None, height=None, line_spacing=1.5,
+                   align='left', surface=None, stroke=(0, 0, 0),
+                   fill=(1, 1, 1), offset=None, single_layout=False,
+                   linear=None):
+    '''
+    Render lines of text with a fitted font (see :func:`render_text`).
+
+    Parameters
+    ----------
+    font : pango.FontDescription
+        Fitted font description (including font size).
+    extents : TextExtents
+        Rendered size of each line of text at :data:`font`.
+    stroke, fill : tuple
+        Stroke and fill colors, as RGB tuples (:data:`fill` may be ``None``).
+
+    Returns
+    -------
+    shape, surface : UREG.Quantity array-like, pango.Surface
+        Shape (i.e., width and height) and surface with rendered text drawn.
+    '''
+    line_height = int(line_spacing * extents.height.max())
+    if width is None:
+        width = extents.width.max()
+    if height is None:
+        height = line_height * len(extents)
+
+    if surface is None:
+        surface = cairo.ImageSurface(cairo.FORMAT_RGB24, int(np.ceil(width)),
+                                     int(height))
+    else:
+        if hasattr(surface, 'set_height'):
+            surface.set_height(height)
+            print 'set_height', height
+        if hasattr(surface, 'set_width'):
+            surface.set_width(width)
+            print 'set_width', width
+
+    context = cairo.Context(surface)
+
+    # Render with the same metrics mode used to fit the text.
+    linear = _resolve_linear(linear)
+    if linear:
+        context.set_font_options(_linear_font_options())
+
+    pangocairo_context = pangocairo.CairoContext(context)
+    pangocairo_context.set_antialias(cairo.ANTIALIAS_DEFAULT)
+
+    if fill is not None:
+        context.set_source_rgb(*fill)
+        context.paint()
+    context.save()
+
+    if offset is not None:
+        context.translate(*offset)
+
+    context.set_source_rgb(*stroke)
+    if single_layout:
+        _draw_text_block(context, pangocairo_context, font, extents.text,
+                         width, line_height, extents.height.max(),
+                         align=align, linear=linear)
+    else:
+        _draw_lines(context, pangocairo_context, font, extents.text, width,
+                    line_height, align=align, linear=linear)
+
+    context.restore()
+    shape = np.array([width, height]) * UREG.pixel
+    return shape, surface
 
 
 def render_text(text, align='left', surface=None, stroke=(0, 0, 0),
-                fill=(1, 1, 1), offset=None, **kwargs):
+                fill=(1, 1, 1), offset=None, single_layout=False, **kwargs):
     '''
     Render the specified text.
 
@@ -204,6 +427,13 @@ def render_text(text, align='left', surface=None, stroke=(0, 0, 0),
         Default: ``(1, 1, 1)``, i.e., white.
     offset : tuple, optional
         Translate rendered text by x/y offset.
+    single_layout : bool, optional
+        If ``True``, join lines into a single Pango layout, using Pango line
+        spacing and alignment to match :data:`line_spacing` and :data:`align`,
+        so the text is laid out and drawn in one call.
+
+        Output is equivalent to drawing each line separately (the default), up
+        to sub-pixel differences in line placement.
     width : float or UREG.Quantity, optional
         Width to fit text into.
 
@@ -255,71 +485,556 @@ def render_text(text, align='left', surface=None, stroke=(0, 0, 0),
 
     # Extract magnitude of width/height kwargs (if necessary).
     for key_i in ('width', 'height'):
-        if key_i in kwargs and isinstance(kwargs[key_i], UREG.Quantity):
-            kwargs[key_i] = kwargs[key_i].to('pixel') / UREG.pixel
+        if key_i in kwargs:
+            kwargs[key_i] = _to_pixels(kwargs[key_i])
 
     if 'font' in kwargs:
         font = kwargs['font']
         if hasattr(font, 'get_size') and font.get_size():
             font_size = font.get_size() * pango.SCALE
 
-    font, df_sizes = fit_text(lines, **kwargs)
+    font, extents = _fit_text(lines, **kwargs)
     fitted_font_size = font.get_size() * pango.SCALE
     if font_size is None or fitted_font_size < font_size:
         font_size = fitted_font_size
 
-    line_spacing = kwargs.pop('line_spacing', 1.5)
-    line_height = int(line_spacing * df_sizes.height.max())
+    return _render_fitted(font, extents, width=kwargs.get('width'),
+                          height=kwargs.get('height'),
+                          line_spacing=kwargs.get('line_spacing', 1.5),
+                          align=align, surface=surface, stroke=stroke,
+                          fill=fill, offset=offset,
+                          single_layout=single_layout,
+                          linear=kwargs.get('linear'))
 
-    width = kwargs.pop('width', df_sizes.width.max())
-    height = kwargs.pop('height', line_height * len(lines))
 
-    if surface is None:
-        surface = cairo.ImageSurface(cairo.FORMAT_RGB24, int(np.ceil(width)),
-                                     int(height))
+def render_batch(texts, width=None, height=None, font='Serif 12',
+                 line_spacing=1.5, uniform=False, fit=True, linear=None,
+                 **kwargs):
+    '''
+    Render many labels into the same box.
+
+    The lines of all labels are estimated in a single pass (see
+    :class:`GlyphAdvanceTable`), and the font size of every label is
+    predicted from the estimates at once.  Each prediction is then verified
+    (and refined) by measuring the label with the measurement context of the
+    calling thread (see :func:`solve_font_size`), and the label is rendered.
+
+    Parameters
+    ----------
+    texts : list-like
+        Text of each label (a string, or list of lines).
+    width : float or UREG.Quantity, optional
+        Width to fit each label into.
+
+        If specified as a :class:`UREG.Quantity`, automatically translate to
+        pixel units.
+    height : float or UREG.Quantity, optional
+        Height to fit each label into.
+
+        If specified as a :class:`UREG.Quantity`, automatically translate to
+        pixel units.
+    font : pango.FontDescription or str, optional
+        Pango font description or string, e.g., ``"Serif", "Arial 14"``, etc.
+    line_spacing : float, optional
+        Line height relative to maximum text height.
+    uniform : bool, optional
+        If ``True``, render all labels with the same font size, i.e., the
+        largest size at which every label fits.
+    fit : bool, optional
+        If ``False``, render all labels at the size of :data:`font` (in a
+        box of :data:`width` and :data:`height`, if specified).
+    linear : bool, optional
+        If ``True``, fit and render text in linear metrics mode (see
+        :func:`set_linear_metrics`).
+
+        If not specified, use the default linear metrics mode.
+    **kwargs
+        Additional keyword arguments: ``align``, ``stroke``, ``fill``,
+        ``single_layout`` (see :func:`render_text`).
+
+    Yields
+    ------
+    shape, surface : UREG.Quantity array-like, pango.Surface
+        Shape (i.e., width and height) and surface of each label (in the
+        order of :data:`texts`), rendered lazily.
+
+    See also
+    --------
+    :func:`render_text`
+    '''
+    options = _frame_options(kwargs)
+    single_layout = kwargs.pop('single_layout', False)
+    _check_kwargs('render_batch', kwargs)
+    width = _to_pixels(width)
+    height = _to_pixels(height)
+    linear = _resolve_linear(linear)
+
+    for font_i, extents_i in _fit_batch(texts, width, height, font,
+                                        line_spacing, uniform, fit, linear):
+        yield _render_fitted(font_i, extents_i, width=width, height=height,
+                             line_spacing=line_spacing,
+                             align=options['align'], stroke=options['stroke'],
+                             fill=options['fill'],
+                             single_layout=single_layout, linear=linear)
+
+
+def _fit_batch(texts, width, height, font, line_spacing, uniform, fit,
+               linear):
+    '''
+    Fit many labels into the same box (see :func:`render_batch`).
+
+    Yields
+    ------
+    pango.FontDescription, TextExtents
+        Font description (including font size) and line extents of each
+        label.
+    '''
+    font = (pango.FontDescription(font)
+            if isinstance(font, types.StringTypes)
+            else font.copy())
+    context = get_measurement_context(linear)
+
+    labels = [[text_i] if isinstance(text_i, types.StringTypes)
+              else (list(text_i) or ['']) for text_i in texts]
+    lengths = np.array([len(label_i) for label_i in labels], dtype=int)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    lines = [line_j for label_i in labels for line_j in label_i]
+
+    def _split(extents):
+        return [TextExtents(label_i, extents.width[start_i:end_i],
+                            extents.height[start_i:end_i])
+                for label_i, start_i, end_i in zip(labels, starts, ends)]
+
+    if not fit or (width is None and height is None):
+        if font.get_size() == 0:
+            raise ValueError('Font size must be given if text is not fitted '
+                             '(or neither `width` nor `height` is '
+                             'specified).')
+        for extents_i in _split(context.measure_many(lines, font)):
+            yield font, extents_i
+        return
+
+    # Estimate size of every line per pt in one pass, and predict the font
+    # size (in pt) of every label.
+    estimates = get_glyph_table(font, linear).estimate(lines, 1)
+    line_heights = (None if height is None else
+                    height / (lengths * float(line_spacing)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.full(len(labels), np.inf)
+        if width is not None:
+            ratios = np.minimum(ratios, width /
+                                np.maximum.reduceat(estimates.width, starts))
+        if line_heights is not None:
+            ratios = np.minimum(ratios, line_heights /
+                                np.maximum.reduceat(estimates.height, starts))
+    # Labels without width (e.g., blank labels) are not limited by `width`
+    # (nor by `height`, if not specified), so they are rendered at the size
+    # of `font`.
+    limited = np.isfinite(ratios)
+    default_size = font.get_size() or 12 * pango.SCALE
+    with np.errstate(invalid='ignore'):
+        sizes = np.where(limited, np.clip(ratios * pango.SCALE, 1,
+                                          MAX_FONT_SIZE), default_size)
+
+    if uniform and not limited.any():
+        font.set_size(default_size)
+        for extents_i in _split(context.measure_many(lines, font)):
+            yield font, extents_i
+        return
+    if uniform:
+        solution = solve_font_size(lines, font, width=width,
+                                   height=(None if line_heights is None else
+                                           np.repeat(line_heights, lengths)),
+                                   size=int(sizes[limited].min()),
+                                   estimates=estimates, context=context)
+        font.set_size(solution.size)
+        for extents_i in _split(solution.extents):
+            yield font, extents_i
+        return
+
+    for i, label_i in enumerate(labels):
+        font_i = font.copy()
+        if not limited[i]:
+            font_i.set_size(default_size)
+            yield font_i, context.measure_many(label_i, font_i)
+            continue
+        key = _fit_cache_key(label_i, font, width, height, line_spacing,
+                             linear)
+        cached = _get_fit(key, label_i)
+        if cached is None:
+            start_i, end_i = starts[i], ends[i]
+            estimates_i = TextExtents(label_i,
+                                      estimates.width[start_i:end_i],
+                                      estimates.height[start_i:end_i])
+            solution = solve_font_size(label_i, font, width=width,
+                                       height=(None if line_heights is None
+                                               else line_heights[i]),
+                                       size=int(sizes[i]),
+                                       estimates=estimates_i,
+                                       context=context)
+            _put_fit(key, solution.size, solution.extents)
+            cached = solution.size, solution.extents
+        font_i.set_size(cached[0])
+        yield font_i, cached[1]
+
+
+def _init_render_worker(font, linear):
+    '''
+    Prewarm a render worker process: load the font, and build the glyph
+    advance table for common characters.
+    '''
+    context = get_measurement_context(linear)
+    context.warm([font])
+    get_glyph_table(font, linear).estimate([string.printable], 1)
+
+
+def _chunk_kwargs(kwargs):
+    kwargs = dict(kwargs)
+    size = kwargs.pop('size', None)
+    if size is not None:
+        # Font size (in Pango units) is passed separately, since font
+        # description strings may round the size.
+        kwargs['font'] = pango.FontDescription(kwargs['font'])
+        kwargs['font'].set_size(size)
+    return kwargs
+
+
+def _render_chunk(args):
+    '''
+    Render a chunk of labels (see :func:`render_batch`).
+
+    Returns
+    -------
+    list
+        Shape and surface of each label.
+    '''
+    texts, kwargs = args
+    return list(render_batch(texts, **_chunk_kwargs(kwargs)))
+
+
+def _render_png_chunk(args):
+    '''
+    Render a chunk of labels (see :func:`render_batch`) to PNG.
+
+    Returns
+    -------
+    list
+        Shape (in pixels) and PNG-encoded bytes of each label.
+    '''
+    texts, kwargs = args
+    return [(shape_i.magnitude, _png_bytes(surface_i))
+            for shape_i, surface_i in render_batch(texts,
+                                                   **_chunk_kwargs(kwargs))]
+
+
+def _png_bytes(surface):
+    '''
+    Returns
+    -------
+    str
+        PNG-encoded image of :data:`surface`.
+    '''
+    with io.BytesIO() as output:
+        surface.write_to_png(output)
+        return output.getvalue()
+
+
+def _batch_options(texts, kwargs):
+    '''
+    Convert keyword arguments of :func:`render_batch` to picklable values
+    shared by every chunk of labels.
+
+    If ``uniform=True``, the shared font size is solved (and passed as
+    ``size``).
+
+    Returns
+    -------
+    list-like, str, bool
+        Text of each label (a list if ``uniform=True``), font description
+        string, and linear metrics mode.
+    '''
+    for key_i in ('width', 'height'):
+        if key_i in kwargs:
+            kwargs[key_i] = _to_pixels(kwargs[key_i])
+    font = kwargs.get('font', 'Serif 12')
+    if not isinstance(font, types.StringTypes):
+        font = font.to_string()
+    kwargs['font'] = font
+    kwargs['linear'] = linear = _resolve_linear(kwargs.get('linear'))
+
+    if kwargs.pop('uniform', False) and kwargs.get('fit', True):
+        # Solve the shared font size once, and render every chunk at it.
+        texts = list(texts)
+        font_i, extents_i = next(_fit_batch(texts, kwargs.get('width'),
+                                            kwargs.get('height'), font,
+                                            kwargs.get('line_spacing', 1.5),
+                                            True, True, linear))
+        kwargs['size'] = font_i.get_size()
+        kwargs['fit'] = False
+    return texts, font, linear
+
+
+def _batch_tasks(texts, chunksize, kwargs):
+    '''
+    Split labels into chunks to render with :func:`render_batch`.
+
+    Returns
+    -------
+    list, str, bool
+        ``(texts, kwargs)`` of each chunk (picklable), font description
+        string, and linear metrics mode.
+    '''
+    texts, font, linear = _batch_options(texts, kwargs)
+    texts = list(texts)
+    tasks = [(texts[i:i + chunksize], kwargs)
+             for i in xrange(0, len(texts), chunksize)]
+    return tasks, font, linear
+
+
+def _imap_chunks(function, tasks, pool, create_pool):
+    '''
+    Apply :data:`function` to each task using :data:`pool` (or a pool from
+    :data:`create_pool`, closed afterwards), and yield the results of every
+    chunk in order.
+    '''
+    close = None
+    if pool is None:
+        close = pool = create_pool()
+    try:
+        for results_i in pool.imap(function, tasks):
+            for result_j in results_i:
+                yield result_j
+        if close is not None:
+            close.close()
+    finally:
+        if close is not None:
+            # Stop workers (if not all labels were consumed).
+            close.terminate()
+            close.join()
+
+
+def render_batch_png(texts, processes=None, chunksize=64, pool=None,
+                     **kwargs):
+    '''
+    Render many labels into the same box on multiple processes.
+
+    Labels are dispatched to worker processes in chunks, and each chunk is
+    rendered with :func:`render_batch` (sharing the estimation pass within
+    the chunk).  Each worker loads the font and measurement context once,
+    when it is started.  Rendered labels are returned as PNG-encoded bytes
+    (rather than pickled surfaces), in the order of :data:`texts`.
+
+    Parameters
+    ----------
+    texts : list-like
+        Text of each label (a string, or list of lines).
+    processes : int, optional
+        Number of worker processes (default: number of CPUs).
+
+        If ``0``, render in the calling process.
+    chunksize : int, optional
+        Number of labels per task.
+    pool : multiprocessing.Pool, optional
+        Pool of worker processes to render with (not closed afterwards).
+
+        If not specified, a pool of :data:`processes` workers is started (and
+        closed once all labels are rendered).
+    **kwargs
+        Keyword arguments passed to :func:`render_batch`, e.g., ``width``,
+        ``height``, ``font``, ``uniform``.
+
+        If ``uniform=True``, the shared font size is solved in the calling
+        process before dispatching the labels.
+
+    Yields
+    ------
+    shape, png : UREG.Quantity array-like, str
+        Shape (i.e., width and height) and PNG-encoded image of each label.
+
+    See also
+    --------
+    :func:`render_batch_threads`
+    '''
+    tasks, font, linear = _batch_tasks(texts, chunksize, kwargs)
+    if processes == 0 and pool is None:
+        results = (result_j for task_i in tasks
+                   for result_j in _render_png_chunk(task_i))
     else:
-        if hasattr(surface, 'set_height'):
-            surface.set_height(height)
-            print 'set_height', height
-        if hasattr(surface, 'set_width'):
-            surface.set_width(width)
-            print 'set_width', width
+        results = _imap_chunks(_render_png_chunk, tasks, pool,
+                               lambda: multiprocessing
+                               .Pool(processes,
+                                     initializer=_init_render_worker,
+                                     initargs=(font, linear)))
+    for shape_i, png_i in results:
+        yield shape_i * UREG.pixel, png_i
 
-    context = cairo.Context(surface)
 
-    pangocairo_context = pangocairo.CairoContext(context)
-    pangocairo_context.set_antialias(cairo.ANTIALIAS_DEFAULT)
+def render_batch_threads(texts, threads=None, chunksize=64, pool=None,
+                         **kwargs):
+    '''
+    Render many labels into the same box on multiple threads.
 
-    def _get_text_layout(text):
-        layout = pangocairo_context.create_layout()
-        layout.set_font_description(font)
-        layout.set_text(text)
-        return layout
+    Same as :func:`render_batch_png`, but chunks are rendered by a pool of
+    threads (each with its own measurement context), and surfaces are
+    returned directly.  Cairo releases the GIL while rasterizing, so
+    rendering overlaps across threads.
 
-    if fill is not None:
-        context.set_source_rgb(*fill)
-        context.paint()
-    context.save()
+    Parameters
+    ----------
+    texts : list-like
+        Text of each label (a string, or list of lines).
+    threads : int, optional
+        Number of worker threads (default: number of CPUs).
+    chunksize : int, optional
+        Number of labels per task.
+    pool : multiprocessing.pool.ThreadPool, optional
+        Pool of threads to render with (not closed afterwards).
+
+        If not specified, a pool of :data:`threads` threads is started (and
+        closed once all labels are rendered).
+    **kwargs
+        Keyword arguments passed to :func:`render_batch`, e.g., ``width``,
+        ``height``, ``font``, ``uniform``.
 
-    if offset is not None:
-        context.translate(*offset)
+    Yields
+    ------
+    shape, surface : UREG.Quantity array-like, pango.Surface
+        Shape (i.e., width and height) and surface of each label (in the
+        order of :data:`texts`).
+    '''
+    from multiprocessing.pool import ThreadPool
 
-    for line_i, row_i in df_sizes.iterrows():
-        context.save()
-        if align == 'center':
-            context.translate(.5 * (width - row_i.width), 0)
-        elif align == 'right':
-            context.translate((width - row_i.width), 0)
-        layout = _get_text_layout(line_i)
-        context.set_source_rgb(*stroke)
-        pangocairo_context.update_layout(layout)
-        pangocairo_context.show_layout(layout)
-        context.restore()
-        context.translate(0, line_height)
+    tasks, font, linear = _batch_tasks(texts, chunksize, kwargs)
+    return _imap_chunks(_render_chunk, tasks, pool,
+                        lambda: ThreadPool(threads,
+                                           initializer=_init_render_worker,
+                                           initargs=(font, linear)))
 
-    context.restore()
-    shape = np.array([width, height]) * UREG.pixel
-    return shape, surface
+
+def _to_unicode(value):
+    '''
+    Returns
+    -------
+    unicode
+        Text of :data:`value` (byte strings are decoded as UTF-8).
+    '''
+    if isinstance(value, str):
+        return value.decode('utf-8')
+    return unicode(value)
+
+
+def _record_text(text):
+    '''
+    Returns
+    -------
+    function
+        Function returning text of a label (a string, or list of lines) from
+        a record (see :func:`render_records`).
+    '''
+    if callable(text):
+        return text
+    if isinstance(text, types.StringTypes):
+        # Format as text, since records may have non-ASCII `unicode` values
+        # (e.g., from `json.loads`) or UTF-8 byte string values (e.g., from
+        # `csv.DictReader`).  Other values are formatted as is (e.g., with
+        # numeric format specifications).
+        text = _to_unicode(text)
+
+        def _format(record):
+            values = {key_i: (value_i.decode('utf-8')
+                              if isinstance(value_i, str) else value_i)
+                      for key_i, value_i in record.iteritems()}
+            return text.format(**values).splitlines()
+        return _format
+    return lambda record: [_to_unicode(record[field_i]) for field_i in text]
+
+
+def _iter_records(records):
+    '''
+    Yields
+    ------
+    dict
+        Each record, where data frames (e.g., chunks from
+        :func:`pandas.read_csv` with ``chunksize``) are read row by row.
+    '''
+    for record_i in records:
+        if hasattr(record_i, 'to_dict') and hasattr(record_i, 'columns'):
+            for row_j in record_i.to_dict('records'):
+                yield row_j
+        else:
+            yield record_i
+
+
+def render_records(records, text, key=None, chunksize=64, **kwargs):
+    '''
+    Render a label for each record of a stream to PNG.
+
+    Records are read lazily, :data:`chunksize` at a time.  Labels of each
+    chunk are fitted into the same box together (see :func:`render_batch`),
+    and each label is rasterized and encoded as it is yielded.  At most one
+    chunk of records (and one rendered label) is held in memory at once.
+
+    Parameters
+    ----------
+    records : iterable
+        Records (e.g., :class:`dict` objects), or data frames of records
+        (e.g., from :func:`pandas.read_csv` with ``chunksize``).
+    text : str, list-like, or callable
+        Text of each label:
+
+         - ``str``: format string (e.g., ``"{name}\\n{id}"``), formatted
+           with the fields of each record.  Each line of the formatted text
+           is a line of the label.
+         - list-like: names of fields, one line per field.
+         - callable: called with each record, returning the text of the
+           label (a string, or list of lines).
+    key : str or callable, optional
+        Name of the field identifying each record, or function returning the
+        key of a record.
+
+        If not specified, records are identified by their index in the
+        stream.
+    chunksize : int, optional
+        Number of records fitted together.
+    **kwargs
+        Keyword arguments passed to :func:`render_batch`, e.g., ``width``,
+        ``height``, ``font``.
+
+        ``uniform=True`` is not supported, since the whole stream must be read
+        to solve a shared font size.
+
+    Yields
+    ------
+    key, png : object, str
+        Key and PNG-encoded image of each label (in the order of
+        :data:`records`).
+    '''
+    if kwargs.get('uniform'):
+        raise ValueError('`uniform` is not supported for streams of records.')
+    record_text = _record_text(text)
+    if key is None:
+        counter = itertools.count()
+
+        def record_key(record):
+            return next(counter)
+    elif callable(key):
+        record_key = key
+    else:
+        def record_key(record):
+            return record[key]
+
+    records = _iter_records(records)
+    while True:
+        chunk = list(itertools.islice(records, chunksize))
+        if not chunk:
+            return
+        keys = map(record_key, chunk)
+        texts = map(record_text, chunk)
+        del chunk
+        labels = render_batch(texts, **kwargs)
+        for key_i, (shape_i, surface_i) in itertools.izip(keys, labels):
+            yield key_i, _png_bytes(surface_i)
 
 
 def render_frame_text(df_data, width, font='Serif 12', column_padding=.1,
@@ -346,7 +1061,10 @@ def render_frame_text(df_data, width, font='Serif 12', column_padding=.1,
         If not specified, create a :class:`pango.ImageSurface` and
         automatically size to fitted text.
     **kwargs
-        Additional keyword arguments passed to :func:`render_text`.
+        Additional keyword arguments: ``align``, ``stroke``, ``fill`` (see
+        :func:`render_text`), ``height``, ``line_spacing``, ``linear``,
+        ``min_widths``, ``max_widths``, ``executor`` (see
+        :func:`layout_table`), and ``formats`` (see :func:`format_frame`).
 
     Returns
     -------
@@ -365,79 +1083,412 @@ def render_frame_text(df_data, width, font='Serif 12', column_padding=.1,
 
     See also
     --------
-    :func:`fit_text`, :func:`render_text`
+    :func:`layout_table`, :func:`render_text`
+    '''
+    options = _frame_options(kwargs)
+    width = _to_pixels(width)
+    height = _to_pixels(kwargs.pop('height', None))
+
+    # Convert table to string representations (column-wise, formatting each
+    # category of categorical columns once).
+    columns = format_frame(df_data, kwargs.pop('formats', None))
+    min_widths = kwargs.pop('min_widths', None)
+    max_widths = kwargs.pop('max_widths', None)
+    executor = kwargs.pop('executor', None)
+    _check_kwargs('render_frame_text', kwargs)
+
+    # Solve column widths and a shared font size, measuring only the cells
+    # that may limit the font size.
+    layout = layout_table(columns, width, font=font,
+                          column_padding=column_padding, height=height,
+                          line_spacing=options['line_spacing'],
+                          linear=options['linear'], min_widths=min_widths,
+                          max_widths=max_widths, executor=executor)
+    return _render_table(layout, None, width, layout.height, surface,
+                         column_padding=column_padding, **options)
+
+
+def _frame_options(kwargs):
     '''
-    align = kwargs.pop('align', 'left')
-    line_spacing = kwargs.get('line_spacing', 1.5)
+    Pop table drawing options (with defaults) from :data:`kwargs`.
+    '''
+    options = {'align': kwargs.pop('align', 'left'),
+               'line_spacing': kwargs.pop('line_spacing', 1.5),
+               'linear': _resolve_linear(kwargs.pop('linear', None)),
+               'fill': kwargs.pop('fill', 1),
+               'stroke': kwargs.pop('stroke', (0, 0, 0))}
+    if options['fill'] is not None:
+        try:
+            iter(options['fill'])
+        except TypeError:
+            options['fill'] = 3 * (options['fill'], )
+    try:
+        iter(options['stroke'])
+    except TypeError:
+        options['stroke'] = 3 * (options['stroke'], )
+    return options
 
-    fit_text_kwargs = {'height': kwargs.get('height', None),
-                       'line_spacing': line_spacing}
 
-    if isinstance(font, types.StringTypes):
-        font = pango.FontDescription(font)
-        if font.get_size() == 0:
-            font.set_size(12 * pango.SCALE)
+def _check_kwargs(name, kwargs):
+    '''
+    Raise :class:`TypeError` if any keyword arguments are left in
+    :data:`kwargs` (i.e., not accepted by the function :data:`name`).
+    '''
+    if kwargs:
+        raise TypeError('%s() got unexpected keyword argument(s): %s' %
+                        (name, ', '.join(sorted(kwargs))))
 
-    if isinstance(width, UREG.Quantity):
-        width = width.to('pixel') / UREG.pixel
 
-    # Convert table to string representations.
-    df_data = df_data.applymap(str)
+def _render_table(layout, columns, width, height, surface, align='left',
+                  line_spacing=1.5, linear=False, fill=(1, 1, 1),
+                  stroke=(0, 0, 0), column_padding=.1):
+    '''
+    Draw table layout (or the specified columns of text, using the table
+    layout) to a surface.
 
-    columns = df_data.columns
-    column_widths = pd.Series({column_i: fit_text(df_data[column_i],
-                                                  font=font)[1]
-                               .width.max() for column_i in columns})
-    column_widths *= width / ((1 + column_padding) * column_widths.sum())
-    column_widths = column_widths[columns]
+    Returns
+    -------
+    shape, surface : UREG.Quantity array-like, pango.Surface
+        Shape (i.e., width and height) and surface with rendered text drawn.
+    '''
+    if surface is None:
+        surface = cairo.ImageSurface(cairo.FORMAT_RGB24, int(width),
+                                     int(height))
 
-    height = None
-    scaled_font = None
+    context = cairo.Context(surface)
+    if fill is not None:
+        context.set_source_rgb(*fill)
+        context.paint()
+    context.set_source_rgb(*stroke)
+    draw_table(context, layout, align=align, column_padding=column_padding,
+               linear=linear, columns=columns)
+    shape = np.array([width, height]) * UREG.pixel
+    return shape, surface
 
-    for column_i, width_i in column_widths.iteritems():
-        lines_i = df_data[column_i]
 
-        font_i, df_sizes_i = fit_text(lines_i, width=width_i, font=font,
-                                      line_spacing=line_spacing)
+def _frame_chunks(data, formats=None):
+    '''
+    Returns
+    -------
+    iterator
+        Chunks of :data:`data` (a data frame, an iterable of data frame
+        chunks, or a callable returning an iterable of data frame chunks),
+        each as a list of columns of strings (see :func:`format_frame`).
+    '''
+    import pandas as pd
 
-        if scaled_font is None or font_i.get_size() < scaled_font.get_size():
-            scaled_font = font_i
-        height_i = df_sizes_i.height.max() * df_sizes_i.shape[0] * line_spacing
-        if height is None or height_i > height:
-            height = height_i
+    if isinstance(data, pd.DataFrame):
+        chunks = [data]
+    elif callable(data):
+        chunks = data()
+    else:
+        chunks = data
+    for chunk_i in chunks:
+        yield format_frame(chunk_i, formats)
 
-    font = scaled_font
-    column_widths *= (1 + column_padding)
-    column_offsets = column_widths.cumsum()
-    column_offsets.values[:] = np.roll(column_offsets.values, 1)
-    column_offsets[0] = 0
 
-    if surface is None:
-        surface = cairo.ImageSurface(cairo.FORMAT_RGB24, int(width),
-                                     int(height))
+def render_frame_pages(data, width, rows_per_page=None, page_height=None,
+                       font='Serif 12', column_padding=.1, **kwargs):
+    '''
+    Render a table as a sequence of pages.
 
-    surface_i = None
-    fill = kwargs.pop('fill', 1)
+    The table is read in chunks, and pages are rendered lazily, so memory is
+    bounded by the size of one page (plus one chunk of input) rather than the
+    size of the table.  All pages share the same font size and column layout.
 
-    for column_i, offset_i in column_offsets.iteritems():
-        lines_i = df_data[column_i]
+    Parameters
+    ----------
+    data : pandas.DataFrame, iterable, or callable
+        Table of values to render (as text), either as a data frame, an
+        iterable of data frame chunks (e.g., from
+        ``pandas.read_csv(..., chunksize=...)``), or a callable returning an
+        iterable of data frame chunks.
+
+        The font size and column widths are solved from a first pass over the
+        whole table, unless :data:`data` is an iterator (which can only be
+        read once).  In that case, they are solved from the first chunk, and
+        the widest cells of each later chunk are checked as it is read.  If
+        a cell is wider than its column, a warning is issued and the layout
+        is re-fitted for the remaining pages (i.e., pages already rendered
+        may use a larger font size).
+    width : float or UREG.Quantity
+        Width to fit text into.
 
-        font_i, df_sizes_i = fit_text(lines_i, font=font, **fit_text_kwargs)
+        If specified as a :class:`UREG.Quantity`, automatically translate to
+        pixel units.
+    rows_per_page : int, optional
+        Number of rows per page.
+    page_height : float or UREG.Quantity, optional
+        Maximum height of each page (ignored if :data:`rows_per_page` is
+        specified).
 
-        slack_i = column_widths[column_i] - df_sizes_i.width.max()
+        If specified as a :class:`UREG.Quantity`, automatically translate to
+        pixel units.
+    font : pango.FontDescription or str, optional
+        Pango font description or string, e.g., ``"Serif", "Arial 14"``, etc.
+    column_padding : float, optional
+        Fraction of total surface width to reserve for padding between columns.
 
-        if align == 'center':
-            offset_i += .5 * (slack_i)
-        elif align == 'right':
-            offset_i += slack_i
+        Default: 0.1, i.e., 10%
+    **kwargs
+        Additional keyword arguments: ``align``, ``stroke``, ``fill``,
+        ``line_spacing``, ``linear``, ``formats`` (see
+        :func:`render_frame_text`).
 
-        # Write text for "i"th column to the common surface.
-        # XXX Only draw fill on **first** iteration to avoid drawing over
-        # previous text.
-        shape_i, surface_i = render_text(lines_i, font=font,
-                                         offset=(offset_i, 0), align=align,
-                                         surface=surface, fill=fill
-                                         if surface_i is None else None,
-                                         **kwargs)
-    shape = np.array([width, height]) * UREG.pixel
-    return shape, surface
+    Yields
+    ------
+    shape, surface : UREG.Quantity array-like, pango.Surface
+        Shape (i.e., width and height) and surface of each page.
+
+    See also
+    --------
+    :func:`render_frame_text`
+    '''
+    if rows_per_page is None and page_height is None:
+        raise ValueError('Either `rows_per_page` or `page_height` must be '
+                         'specified.')
+    options = _frame_options(kwargs)
+    formats = kwargs.pop('formats', None)
+    _check_kwargs('render_frame_pages', kwargs)
+    width = _to_pixels(width)
+    page_height = _to_pixels(page_height)
+    if isinstance(font, types.StringTypes):
+        font = pango.FontDescription(font)
+    else:
+        font = font.copy()
+    if font.get_size() == 0:
+        font.set_size(12 * pango.SCALE)
+
+    # Collect the cells that may limit the font size (i.e., the widest cells
+    # of each column) and solve the layout from those cells only.
+    context = get_measurement_context(options['linear'])
+    streamed = isinstance(data, collections.Iterator)
+    if streamed:
+        # Solve from the first chunk with any rows.
+        first = next((chunk_i for chunk_i in data if len(chunk_i)), None)
+        if first is None:
+            return
+        chunks = itertools.chain([first], data)
+        solve_chunks = [first]
+    else:
+        chunks = solve_chunks = data
+    candidates = _candidates(_frame_chunks(solve_chunks, formats), font,
+                             context, tolerance=.1)[0]
+
+    def _layout(candidates):
+        layout = layout_table(candidates, width, font=font,
+                              column_padding=column_padding,
+                              line_spacing=options['line_spacing'],
+                              context=context)
+        if rows_per_page is not None or not layout.line_height:
+            return layout, rows_per_page
+        return layout, max(int(page_height // layout.line_height), 1)
+
+    layout, page_rows = _layout(candidates)
+    if not layout.line_height:
+        # No rows (or nothing to draw), so no pages.
+        return
+
+    def _page(columns):
+        return _render_table(layout, columns, width, layout.line_height *
+                             len(columns[0]), None,
+                             column_padding=column_padding, **options)
+
+    page = None
+    for i, chunk_i in enumerate(_frame_chunks(chunks, formats)):
+        if not chunk_i:
+            continue
+        if streamed and i > 0:
+            # Layout was solved from the first chunk only, so check that the
+            # widest cells of the chunk fit their columns.
+            candidates = _candidates([candidates, chunk_i], font, context,
+                                     tolerance=.1)[0]
+            column_widths = layout.column_widths / (1 + column_padding)
+            if any(column_j and
+                   context.measure_many(column_j, layout.font).width.max() >
+                   width_j for column_j, width_j in zip(candidates,
+                                                        column_widths)):
+                warnings.warn('Cells of chunk %d are wider than their column; '
+                              're-fitting layout of remaining pages.' % i)
+                layout, page_rows = _layout(candidates)
+        if page is None:
+            page = [[] for column_j in chunk_i]
+        # Fill pages from the chunk, yielding each page once it is full.
+        start, row_count = 0, len(chunk_i[0])
+        while start < row_count:
+            end = min(start + max(page_rows - len(page[0]), 1), row_count)
+            for page_j, column_j in zip(page, chunk_i):
+                page_j.extend(column_j[start:end])
+            start = end
+            if len(page[0]) >= page_rows:
+                yield _page(page)
+                page = [[] for column_j in chunk_i]
+    if page is not None and page[0]:
+        yield _page(page)
+
+
+class IncrementalTableRenderer(object):
+    '''
+    Render a growing table, drawing only appended rows.
+
+    The fitted font, column layout, and raster of the rows drawn so far are
+    kept between appends.  Appended rows are drawn below the existing rows,
+    unless a new cell is wider than its column at the current font size, in
+    which case the table is re-fitted and redrawn.  The raster grows
+    geometrically, so the amortized cost of appending a row is constant.
+
+    Parameters
+    ----------
+    df_data : pandas.DataFrame
+        Initial table of values to render (as text).  Determines the columns
+        of the table (may have no rows).
+    width : float or UREG.Quantity
+        Width to fit text into.
+
+        If specified as a :class:`UREG.Quantity`, automatically translate to
+        pixel units.
+    font : pango.FontDescription or str, optional
+        Pango font description or string, e.g., ``"Serif", "Arial 14"``, etc.
+    column_padding : float, optional
+        Fraction of total surface width to reserve for padding between columns.
+
+        Default: 0.1, i.e., 10%
+    **kwargs
+        Additional keyword arguments: ``align``, ``stroke``, ``fill``,
+        ``line_spacing``, ``linear``, ``formats`` (see
+        :func:`render_frame_text`).
+
+    Attributes
+    ----------
+    layout : TableLayout
+        Current table layout (``None`` until the first row is appended).
+    refits : int
+        Number of times the table has been fitted.
+
+    Example
+    -------
+
+        >>> renderer = IncrementalTableRenderer(df_log, 600)
+        >>> renderer.append(df_new_rows)
+        >>> shape, surface = renderer.render()
+
+    See also
+    --------
+    :func:`render_frame_text`
+    '''
+    def __init__(self, df_data, width, font='Serif 12', column_padding=.1,
+                 **kwargs):
+        self._options = _frame_options(kwargs)
+        self._formats = kwargs.pop('formats', None)
+        _check_kwargs('IncrementalTableRenderer', kwargs)
+        width = _to_pixels(width)
+        self.width = width
+        if isinstance(font, types.StringTypes):
+            font = pango.FontDescription(font)
+        else:
+            font = font.copy()
+        if font.get_size() == 0:
+            font.set_size(12 * pango.SCALE)
+        self.font = font
+        self.column_padding = column_padding
+        self.columns = list(df_data.columns)
+        self.layout = None
+        self.refits = 0
+        self._cells = [[] for column_i in self.columns]
+        self._surface = None
+        self._capacity = 0
+        self.append(df_data)
+
+    def __len__(self):
+        return len(self._cells[0]) if self._cells else 0
+
+    @property
+    def shape(self):
+        '''
+        Shape (i.e., width and height) of the rendered table (in pixels).
+        '''
+        height = self.layout.line_height * len(self) if self.layout else 0
+        return np.array([self.width, height]) * UREG.pixel
+
+    def append(self, df_rows):
+        '''
+        Append rows to the table, drawing only the new rows (unless a new cell
+        does not fit its column at the current font size).
+
+        Parameters
+        ----------
+        df_rows : pandas.DataFrame
+            Rows to append, with (at least) the columns of the table.
+        '''
+        if not len(df_rows):
+            return
+        rows = [np.asarray(rows_i, dtype=object).tolist() for rows_i in
+                format_frame(df_rows[self.columns], self._formats)]
+        start = len(self)
+        for cells_i, rows_i in zip(self._cells, rows):
+            cells_i.extend(rows_i)
+        if self.layout is None or not self._fits(rows):
+            self._refit()
+        else:
+            self._reserve(len(self))
+            self._draw(rows, start)
+
+    def _fits(self, rows):
+        context = get_measurement_context(self._options['linear'])
+        column_widths = self.layout.column_widths / (1 + self.column_padding)
+        return all(context.measure_many(rows_i, self.layout.font).width.max()
+                   <= width_i for rows_i, width_i in zip(rows,
+                                                         column_widths))
+
+    def _refit(self):
+        self.layout = layout_table(self._cells, self.width, font=self.font,
+                                   column_padding=self.column_padding,
+                                   line_spacing=self._options['line_spacing'],
+                                   linear=self._options['linear'])
+        self.refits += 1
+        self._surface = None
+        self._capacity = 0
+        self._reserve(len(self))
+        self._draw(self._cells, 0)
+
+    def _reserve(self, row_count):
+        # Grow raster (geometrically) to fit at least `row_count` rows.
+        if row_count <= self._capacity:
+            return
+        capacity = max(row_count, 2 * self._capacity, 16)
+        surface = cairo.ImageSurface(cairo.FORMAT_RGB24, int(self.width),
+                                     int(self.layout.line_height * capacity))
+        context = cairo.Context(surface)
+        if self._options['fill'] is not None:
+            context.set_source_rgb(*self._options['fill'])
+            context.paint()
+        if self._surface is not None:
+            context.set_source_surface(self._surface, 0, 0)
+            context.paint()
+        self._surface = surface
+        self._capacity = capacity
+
+    def _draw(self, rows, start):
+        context = cairo.Context(self._surface)
+        context.translate(0, start * int(self.layout.line_height))
+        context.set_source_rgb(*self._options['stroke'])
+        draw_table(context, self.layout, align=self._options['align'],
+                   column_padding=self.column_padding,
+                   linear=self._options['linear'], columns=rows)
+
+    def render(self):
+        '''
+        Returns
+        -------
+        shape, surface : UREG.Quantity array-like, pango.Surface
+            Shape (i.e., width and height) and surface with the rendered
+            table (copied from the raster).
+        '''
+        shape = self.shape
+        surface = cairo.ImageSurface(cairo.FORMAT_RGB24, int(self.width),
+                                     int(shape[1].magnitude))
+        if self._surface is not None:
+            context = cairo.Context(surface)
+            context.set_source_surface(self._surface, 0, 0)
+            context.paint()
+        return shape, surface
@@ -0,0 +1,453 @@
+# coding: utf-8
+'''
+Render from an :mod:`asyncio` event loop without blocking it.
+
+Rendering is offloaded to an executor (the default executor of the event
+loop, unless specified), and each function returns an
+:class:`asyncio.Future`, e.g., ``shape, surface = await
+render_text_async('hello')``.
+
+On Python 2, the :mod:`trollius` backport of :mod:`asyncio` is required.
+'''
+from collections import deque
+import functools
+import itertools
+import weakref
+
+
+__all__ = ['AsyncRenderer', 'render_batch_async', 'render_frame_text_async',
+           'render_text_async']
+
+
+def _asyncio():
+    try:
+        import asyncio
+    except ImportError:
+        import trollius as asyncio
+    return asyncio
+
+
+def _chunks(texts, chunksize, kwargs):
+    '''
+    Yields
+    ------
+    list, dict
+        Text of up to :data:`chunksize` labels (read lazily from
+        :data:`texts`), and keyword arguments of :func:`render_batch`.
+    '''
+    texts = iter(texts)
+    while True:
+        chunk = list(itertools.islice(texts, chunksize))
+        if not chunk:
+            return
+        yield chunk, kwargs
+
+
+def _next_chunk(chunks):
+    '''
+    Returns
+    -------
+    tuple or None
+        Next chunk (see :func:`_chunks`), or ``None`` if there are no more
+        chunks.
+    '''
+    return next(chunks, None)
+
+
+class AsyncRenderer(object):
+    '''
+    Offload rendering from an event loop to an executor.
+
+    At most :data:`concurrency` renders run in the executor at once, and
+    further requests wait (in order) for a free slot.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor, optional
+        Executor to render in (default: default executor of the event loop).
+    concurrency : int, optional
+        Maximum number of renders running at once.
+    max_pending : int, optional
+        Maximum number of requests waiting for a free slot.  Once reached,
+        further requests fail immediately with :class:`asyncio.QueueFull`,
+        rather than queueing without bound.
+    loop : asyncio.AbstractEventLoop, optional
+        Event loop (default: current event loop).
+
+    Notes
+    -----
+    Methods must be called from the thread running the event loop.
+    '''
+    def __init__(self, executor=None, concurrency=4, max_pending=1024,
+                 loop=None):
+        if concurrency < 1:
+            raise ValueError('`concurrency` must be at least 1.')
+        self._asyncio = _asyncio()
+        # Weak reference, so default renderers (keyed by weak reference to
+        # their event loop) do not keep the loop alive.
+        self._loop_ref = weakref.ref(loop or self._asyncio.get_event_loop())
+        self.executor = executor
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self._running = 0
+        self._pending = deque()
+
+    @property
+    def _loop(self):
+        return self._loop_ref()
+
+    @property
+    def running(self):
+        '''
+        Number of renders running in the executor.
+        '''
+        return self._running
+
+    @property
+    def pending(self):
+        '''
+        Number of requests waiting for a free slot.
+        '''
+        return sum(not future_i.cancelled()
+                   for future_i, call_i in self._pending)
+
+    def submit(self, function, *args, **kwargs):
+        '''
+        Call ``function(*args, **kwargs)`` in the executor once a slot is
+        free.
+
+        Returns
+        -------
+        asyncio.Future
+            Result of the call.
+
+            If cancelled while waiting for a slot, the call is never made.
+            If cancelled while running, the result is discarded (the call
+            itself cannot be interrupted, and holds its slot until done).
+
+        Raises
+        ------
+        asyncio.QueueFull
+            If :attr:`max_pending` requests are already waiting.
+        '''
+        if self._running >= self.concurrency:
+            while self._pending and self._pending[0][0].cancelled():
+                self._pending.popleft()
+            if len(self._pending) >= self.max_pending:
+                raise self._asyncio.QueueFull('%d requests already pending.'
+                                              % len(self._pending))
+        return self._submit(functools.partial(function, *args, **kwargs))
+
+    def _submit(self, call):
+        future = self._asyncio.Future(loop=self._loop)
+        self._pending.append((future, call))
+        self._start()
+        return future
+
+    def _start(self):
+        while self._pending and self._running < self.concurrency:
+            future, call = self._pending.popleft()
+            if future.cancelled():
+                continue
+            self._running += 1
+            executor_future = self._loop.run_in_executor(self.executor, call)
+            executor_future.add_done_callback(functools.partial(self._done,
+                                                                future))
+
+    def _done(self, future, executor_future):
+        self._running -= 1
+        if future.done():
+            # Cancelled while running.
+            pass
+        elif executor_future.cancelled():
+            future.cancel()
+        elif executor_future.exception() is not None:
+            future.set_exception(executor_future.exception())
+        else:
+            future.set_result(executor_future.result())
+        self._start()
+
+    def render_text(self, text, **kwargs):
+        '''
+        Render text (see :func:`docket.render_text`).
+
+        Returns
+        -------
+        asyncio.Future
+            Shape and surface of the rendered text (see :meth:`submit`).
+        '''
+        from . import render_text
+
+        return self.submit(render_text, text, **kwargs)
+
+    def render_frame_text(self, df_data, width, **kwargs):
+        '''
+        Render a table (see :func:`docket.render_frame_text`).
+
+        Returns
+        -------
+        asyncio.Future
+            Shape and surface of the rendered table (see :meth:`submit`).
+        '''
+        from . import render_frame_text
+
+        return self.submit(render_frame_text, df_data, width, **kwargs)
+
+    def render_batch(self, texts, chunksize=16, maxsize=64, **kwargs):
+        '''
+        Render many labels into the same box (see :func:`docket.render_batch`).
+
+        Labels are read from :data:`texts` lazily (in the executor, one chunk
+        at a time) and rendered in chunks, with at most :attr:`concurrency`
+        chunks in flight.  Rendered labels are put to a queue of at most
+        :data:`maxsize` labels, in order; while the queue is full, no further
+        labels are read or rendered.
+
+        Parameters
+        ----------
+        texts : iterable
+            Text of each label (a string, or list of lines).
+
+            If ``uniform=True``, every label is read (in the executor) to
+            solve the shared font size before rendering.
+        chunksize : int, optional
+            Number of labels per render.
+        maxsize : int, optional
+            Maximum number of rendered labels in the queue.
+        **kwargs
+            Keyword arguments passed to :func:`docket.render_batch`.
+
+        Returns
+        -------
+        asyncio.Queue, asyncio.Future
+            Queue of shape and surface of each label, followed by ``None``
+            once every label is rendered; and future, done once every label
+            is queued.
+
+            If reading or rendering labels fails, the exception is set on the
+            future (and no ``None`` is queued).  Cancel the future to stop
+            rendering.
+        '''
+        from . import _batch_options
+
+        batch = _BatchRender(self, maxsize)
+        options = self._submit(functools.partial(_batch_options, texts,
+                                                 kwargs))
+        batch.in_flight.append(options)
+
+        def start(options):
+            if batch.done.done():
+                return
+            batch.in_flight.popleft()
+            if options.cancelled():
+                batch.done.cancel()
+            elif options.exception() is not None:
+                batch.fail(options.exception())
+            else:
+                batch.chunks = _chunks(options.result()[0], chunksize,
+                                       kwargs)
+                batch.step()
+        options.add_done_callback(start)
+        return batch.queue, batch.done
+
+
+class _BatchRender(object):
+    '''
+    Render chunks of labels from an iterator, and put rendered labels to a
+    bounded queue in order (see :meth:`AsyncRenderer.render_batch`).
+    '''
+    def __init__(self, renderer, maxsize):
+        asyncio = renderer._asyncio
+        self.renderer = renderer
+        self.chunks = None
+        self.queue = asyncio.Queue(maxsize, loop=renderer._loop)
+        self.done = asyncio.Future(loop=renderer._loop)
+        self.done.add_done_callback(self._stop)
+        # Renders of chunks, in order.
+        self.in_flight = deque()
+        # Rendered labels not yet in the queue.
+        self.items = deque()
+        self.put = None
+        # Read of the next chunk of labels (if any).
+        self.reading = None
+        self.finished = False
+
+    def fail(self, exception):
+        if not self.done.done():
+            self.done.set_exception(exception)
+
+    def _stop(self, done):
+        for future_i in self.in_flight:
+            future_i.cancel()
+        if self.reading is not None:
+            self.reading.cancel()
+        if self.put is not None:
+            self.put.cancel()
+
+    def _fill(self):
+        # Read the next chunk in the executor (so a slow iterator does not
+        # block the event loop), one chunk at a time (so chunks are read in
+        # order).
+        if (self.chunks is not None and self.reading is None and
+                len(self.in_flight) < self.renderer.concurrency):
+            self.reading = self.renderer._submit(functools
+                                                 .partial(_next_chunk,
+                                                          self.chunks))
+            self.reading.add_done_callback(self._read_done)
+
+    def _read_done(self, reading):
+        from . import _render_chunk
+
+        self.reading = None
+        if self.done.done():
+            return
+        if reading.cancelled():
+            self.done.cancel()
+            return
+        if reading.exception() is not None:
+            self.fail(reading.exception())
+            return
+        chunk = reading.result()
+        if chunk is None:
+            self.chunks = None
+        else:
+            future = self.renderer._submit(functools.partial(_render_chunk,
+                                                             chunk))
+            future.add_done_callback(self.step)
+            self.in_flight.append(future)
+        self.step()
+
+    def _put_done(self, put):
+        self.put = None
+        if not put.cancelled() and put.exception() is None:
+            self.items.popleft()
+            self.step()
+
+    def step(self, *args):
+        asyncio = self.renderer._asyncio
+
+        while not self.done.done():
+            while self.items:
+                try:
+                    self.queue.put_nowait(self.items[0])
+                except asyncio.QueueFull:
+                    if self.put is None:
+                        # Wait for the consumer (backpressure).
+                        self.put = asyncio.ensure_future(self.queue
+                                                         .put(self.items[0]),
+                                                         loop=self.renderer
+                                                         ._loop)
+                        self.put.add_done_callback(self._put_done)
+                    return
+                self.items.popleft()
+            if self.finished:
+                self.done.set_result(None)
+                return
+            self._fill()
+            if not self.in_flight:
+                if self.chunks is not None:
+                    # Wait for the next chunk to be read.
+                    return
+                self.finished = True
+                self.items.append(None)
+                continue
+            future = self.in_flight[0]
+            if not future.done():
+                return
+            self.in_flight.popleft()
+            if future.cancelled():
+                self.done.cancel()
+            elif future.exception() is not None:
+                self.fail(future.exception())
+            else:
+                self.items.extend(future.result())
+
+
+_renderers = weakref.WeakKeyDictionary()
+
+
+def _default_renderer():
+    '''
+    Returns
+    -------
+    AsyncRenderer
+        Renderer with default options for the current event loop.
+    '''
+    loop = _asyncio().get_event_loop()
+    renderer = _renderers.get(loop)
+    if renderer is None:
+        renderer = _renderers[loop] = AsyncRenderer(loop=loop)
+    return renderer
+
+
+def render_text_async(text, renderer=None, **kwargs):
+    '''
+    Render text in an executor (see :func:`docket.render_text`).
+
+    Parameters
+    ----------
+    text : str or list-like
+        Text to render (a string, or list of lines).
+    renderer : AsyncRenderer, optional
+        Renderer to submit to (default: shared renderer of the current event
+        loop).
+    **kwargs
+        Keyword arguments passed to :func:`docket.render_text`.
+
+    Returns
+    -------
+    asyncio.Future
+        Shape and surface of the rendered text.
+    '''
+    renderer = renderer or _default_renderer()
+    return renderer.render_text(text, **kwargs)
+
+
+def render_frame_text_async(df_data, width, renderer=None, **kwargs):
+    '''
+    Render a table in an executor (see :func:`docket.render_frame_text`).
+
+    Parameters
+    ----------
+    df_data : pandas.DataFrame
+        Table to render.
+    width : float or UREG.Quantity
+        Width of the rendered table.
+    renderer : AsyncRenderer, optional
+        Renderer to submit to (default: shared renderer of the current event
+        loop).
+    **kwargs
+        Keyword arguments passed to :func:`docket.render_frame_text`.
+
+    Returns
+    -------
+    asyncio.Future
+        Shape and surface of the rendered table.
+    '''
+    renderer = renderer or _default_renderer()
+    return renderer.render_frame_text(df_data, width, **kwargs)
+
+
+def render_batch_async(texts, renderer=None, **kwargs):
+    '''
+    Render many labels into the same box in an executor (see
+    :meth:`AsyncRenderer.render_batch`).
+
+    Parameters
+    ----------
+    texts : iterable
+        Text of each label (a string, or list of lines).
+    renderer : AsyncRenderer, optional
+        Renderer to submit to (default: shared renderer of the current event
+        loop).
+    **kwargs
+        Keyword arguments passed to :meth:`AsyncRenderer.render_batch`.
+
+    Returns
+    -------
+    asyncio.Queue, asyncio.Future
+        Queue of shape and surface of each label (followed by ``None``), and
+        future, done once every label is queued.
+    '''
+    renderer = renderer or _default_renderer()
+    return renderer.render_batch(texts, **kwargs)
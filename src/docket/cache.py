@@ -0,0 +1,273 @@
+# coding: utf-8
+'''
+Bounded, thread-safe caches.
+'''
+from collections import namedtuple, OrderedDict
+import threading
+
+
+__all__ = ['CacheInfo', 'LRUCache', 'StripedLRUCache']
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions',
+                                     'maxsize', 'currsize'])
+
+
+class LRUCache(object):
+    '''
+    Thread-safe least-recently-used cache.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of entries to keep.  When full, adding an entry evicts
+        the least recently used entry.
+
+        If ``None``, the cache is unbounded.  If ``0``, nothing is cached.
+    '''
+    def __init__(self, maxsize=1024):
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def get(self, key, default=None):
+        '''
+        Returns
+        -------
+        object
+            Value cached for :data:`key` (marked as most recently used), or
+            :data:`default` if :data:`key` is not cached.
+        '''
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self._misses += 1
+                return default
+            self._data[key] = value
+            self._hits += 1
+            return value
+
+    def put(self, key, value):
+        '''
+        Cache :data:`value` for :data:`key`, evicting least recently used
+        entries as necessary.
+        '''
+        with self._lock:
+            if self._maxsize == 0:
+                return
+            self._data.pop(key, None)
+            self._data[key] = value
+            self._evict()
+
+    def _move(self, key, value):
+        '''
+        Cache an entry moved from another cache, unless :data:`key` is
+        already cached (i.e., a newer entry was added while moving).
+
+        Returns
+        -------
+        int
+            Number of entries evicted (not counted in the statistics of this
+            cache).
+        '''
+        with self._lock:
+            if self._maxsize == 0:
+                return 1
+            if key in self._data:
+                return 0
+            evictions = self._evictions
+            self._data[key] = value
+            self._evict()
+            moved_evictions = self._evictions - evictions
+            self._evictions = evictions
+            return moved_evictions
+
+    def _evict(self):
+        if self._maxsize is None:
+            return
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    def resize(self, maxsize):
+        '''
+        Set maximum number of entries, evicting least recently used entries as
+        necessary.
+        '''
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        '''
+        Remove all entries and reset statistics.
+        '''
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def info(self):
+        '''
+        Returns
+        -------
+        CacheInfo
+            Hit, miss, and eviction counts, maximum size, and current size.
+        '''
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions,
+                             self._maxsize, len(self._data))
+
+
+class StripedLRUCache(object):
+    '''
+    Thread-safe least-recently-used cache split into independently locked
+    stripes, so that threads accessing different keys rarely contend for the
+    same lock.
+
+    Each key is assigned to a stripe by its hash, and each stripe is an
+    :class:`LRUCache` holding an equal share of the entries (so eviction is
+    least-recently-used within each stripe).  Small caches (fewer than
+    :data:`stripe_size` entries per stripe) use fewer stripes, down to a
+    single stripe (i.e., exact least-recently-used eviction).
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of entries to keep.
+
+        If ``None``, the cache is unbounded.  If ``0``, nothing is cached.
+    stripes : int, optional
+        Maximum number of stripes.
+    stripe_size : int, optional
+        Minimum number of entries per stripe.
+
+    Notes
+    -----
+    There is no per-thread tier in front of the shared stripes: an entry
+    cached by one thread is a hit for every other thread (e.g., workers of a
+    pool rendering labels in the same font), whereas a per-thread tier would
+    keep a copy of each entry per thread.  A hit only holds the lock of its
+    stripe while moving the entry, so contention stays low without one.
+    '''
+    def __init__(self, maxsize=1024, stripes=16, stripe_size=64):
+        # Serializes `resize`, `clear`, and `info`.
+        self._lock = threading.Lock()
+        self._max_stripes = stripes
+        self._stripe_size = stripe_size
+        self._maxsize = maxsize
+        # Statistics of stripes discarded by `resize`.
+        self._base = CacheInfo(0, 0, 0, None, None)
+        self._stripes = self._create_stripes(maxsize)
+
+    def _create_stripes(self, maxsize):
+        if maxsize is None:
+            count = self._max_stripes
+        else:
+            count = max(1, min(self._max_stripes,
+                               maxsize // self._stripe_size))
+        stripe_maxsize = None if maxsize is None else -(-maxsize // count)
+        return [LRUCache(stripe_maxsize) for i in xrange(count)]
+
+    def _stripe(self, key):
+        stripes = self._stripes
+        return stripes[hash(key) % len(stripes)]
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def __len__(self):
+        return sum(len(stripe_i) for stripe_i in self._stripes)
+
+    def __contains__(self, key):
+        return key in self._stripe(key)
+
+    def get(self, key, default=None):
+        '''
+        Returns
+        -------
+        object
+            Value cached for :data:`key` (marked as most recently used), or
+            :data:`default` if :data:`key` is not cached.
+        '''
+        return self._stripe(key).get(key, default)
+
+    def put(self, key, value):
+        '''
+        Cache :data:`value` for :data:`key`, evicting least recently used
+        entries (of the same stripe) as necessary.
+        '''
+        self._stripe(key).put(key, value)
+
+    def resize(self, maxsize):
+        '''
+        Set maximum number of entries, evicting least recently used entries as
+        necessary.
+
+        If the number of stripes changes, entries are moved to new stripes
+        (other threads may miss entries that have not been moved yet).
+        '''
+        with self._lock:
+            stripes = self._create_stripes(maxsize)
+            self._maxsize = maxsize
+            if len(stripes) == len(self._stripes):
+                for stripe_i in self._stripes:
+                    stripe_i.resize(stripes[0].maxsize)
+                return
+            # Entries added from now on go to the new stripes.
+            old_stripes, self._stripes = self._stripes, stripes
+            hits, misses, evictions = self._base[:3]
+            for stripe_i in old_stripes:
+                # Copy entries (oldest first, to keep order) and statistics
+                # while holding the lock of the stripe.
+                with stripe_i._lock:
+                    items = stripe_i._data.items()
+                    hits += stripe_i._hits
+                    misses += stripe_i._misses
+                    evictions += stripe_i._evictions
+                for key_j, value_j in items:
+                    evictions += self._stripe(key_j)._move(key_j, value_j)
+            self._base = CacheInfo(hits, misses, evictions, None, None)
+
+    def clear(self):
+        '''
+        Remove all entries and reset statistics.
+        '''
+        with self._lock:
+            self._base = CacheInfo(0, 0, 0, None, None)
+            for stripe_i in self._stripes:
+                stripe_i.clear()
+
+    def info(self):
+        '''
+        Returns
+        -------
+        CacheInfo
+            Hit, miss, and eviction counts, maximum size, and current size
+            (summed over all stripes).
+        '''
+        with self._lock:
+            infos = [self._base] + [stripe_i.info()
+                                    for stripe_i in self._stripes]
+        return CacheInfo(sum(info_i.hits for info_i in infos),
+                         sum(info_i.misses for info_i in infos),
+                         sum(info_i.evictions for info_i in infos),
+                         self._maxsize,
+                         sum(info_i.currsize for info_i in infos[1:]))
@@ -0,0 +1,426 @@
+# coding: utf-8
+'''
+Solve for the largest font size that fits text into a box.
+'''
+from collections import namedtuple
+import hashlib
+
+import numpy as np
+import pango
+
+from .cache import StripedLRUCache
+from .measure import TextExtents, _unique_inverse, get_measurement_context
+
+
+__all__ = ['FontSolution', 'MAX_FONT_SIZE', 'clear_fit_cache',
+           'configure_fit_cache', 'fit_cache_info', 'solve_font_size']
+
+
+#: Largest font size (in Pango units) considered by :func:`solve_font_size`.
+MAX_FONT_SIZE = 2 ** 24
+
+#: Fitted font size and line extents keyed by content hash of the lines of
+#: text, font description, box dimensions, line spacing, and linear metrics
+#: mode (and table layouts, see :func:`layout_table`).
+_fit_cache = StripedLRUCache(maxsize=256)
+
+#: Most recently fitted font size (in Pango units) keyed by font description,
+#: number of lines, box dimensions, line spacing, and linear metrics mode.
+_recent_fits = StripedLRUCache(maxsize=256)
+
+
+class FontSolution(namedtuple('FontSolution', ['size', 'extents', 'fits',
+                                               'iterations'])):
+    '''
+    Font size solution.
+
+    Attributes
+    ----------
+    size : int
+        Font size (in Pango units).
+    extents : TextExtents
+        Rendered size of each line at :attr:`size` (in pixels).
+    fits : bool
+        ``True`` if every line fits at :attr:`size`.  May only be ``False`` if
+        no size down to one Pango unit fits.
+    iterations : int
+        Number of sizes measured to find the solution.
+    '''
+    __slots__ = ()
+
+
+def _critical_lines(sizes, width, height, margin):
+    '''
+    Returns
+    -------
+    numpy.array
+        Indices of lines with a width (or height) relative to the width (or
+        height) limit within :data:`margin` (as a fraction) of the widest (or
+        tallest) line, i.e., the lines that limit the font size.
+    '''
+    index = np.array([], dtype=int)
+    for column_i, limit_i in ((0, width), (1, height)):
+        if limit_i is None or not sizes.shape[0]:
+            continue
+        values_i = sizes[:, column_i] / np.maximum(limit_i, 1e-9)
+        index = np.union1d(index, np.flatnonzero(values_i >= (1 - margin) *
+                                                 values_i.max()))
+    return index
+
+
+def solve_font_size(text, font, width=None, height=None, size=None,
+                    max_size=MAX_FONT_SIZE, margin=.05, estimates=None,
+                    tolerance=None, slack=None, predict=True, linear=None,
+                    context=None):
+    '''
+    Find the largest font size at which every line fits within the specified
+    line width and height.
+
+    The search starts from the initial estimate :data:`size`.  Since text
+    extents are approximately proportional to font size, the sizes measured
+    at the initial estimate are used to predict the solution (unless
+    :data:`predict` is ``False``).  The search then steps away from the
+    prediction in geometrically increasing steps (starting from one Pango
+    unit) until the largest fitting size is bracketed, and bisects the bracket
+    down to a resolution of one Pango unit.
+
+    All lines are measured at the initial estimate (unless :data:`estimates`
+    are provided), but only the *critical* lines (i.e., the widest and tallest
+    lines) are measured while searching.  All lines (or, if :data:`tolerance`
+    is specified, all lines that may not fit) are measured again at the
+    solved size to verify the solution; if kerning or hinting caused another
+    line to become critical, the line is added to the critical lines and the
+    search resumes.
+
+    In linear metrics mode (see :func:`set_linear_metrics`), text extents are
+    proportional to the font size, so the largest fitting size is computed
+    directly from the sizes measured at the initial estimate and the search is
+    skipped (unless verification fails, e.g., due to rounding).
+
+    Repeated lines are only measured once.
+
+    Parameters
+    ----------
+    text : list-like
+        Lines of text to fit.
+    font : pango.FontDescription
+        Pango font description (size is ignored).
+    width : float or array-like, optional
+        Maximum line width (in pixels), or maximum width of each line.
+    height : float or array-like, optional
+        Maximum line height (in pixels), or maximum height of each line.
+    size : int, optional
+        Initial font size estimate (in Pango units).
+
+        If not specified, start from the size of :data:`font` (or 12 pt if
+        :data:`font` has no size).
+    max_size : int, optional
+        Largest font size to consider (in Pango units).
+    margin : float, optional
+        Lines with a width (or height) within this fraction of the widest (or
+        tallest) line at the initial estimate are treated as critical.
+
+        Default: 0.05, i.e., 5%
+    estimates : TextExtents, optional
+        Estimated size of each line at a font size of 1 pt (e.g., from
+        :meth:`GlyphAdvanceTable.estimate`).
+
+        If specified, critical lines are selected using the estimates instead
+        of measuring all lines at the initial estimate.
+    tolerance : float, optional
+        Relative error of :data:`estimates`.
+
+        If specified (along with :data:`estimates`), only lines with an
+        estimated size within this fraction of the width or height limit are
+        measured to verify the solution, and the extents of the remaining lines
+        in the returned solution are estimates.
+    slack : float or array-like, optional
+        Absolute error of the estimated width of each line (in pixels, at any
+        font size), e.g., due to rounding of hinted glyph advances (see
+        :data:`tolerance`).
+    predict : bool, optional
+        If ``True``, predict the solution from the sizes measured at
+        :data:`size`.
+
+        If ``False``, :data:`size` is assumed to be close to the solution
+        (e.g., a previous solution for similar text), so the adjacent size
+        is measured first: if :data:`size` is the solution, it is found in
+        two measurements (plus verification).  Otherwise, the solution is
+        predicted as for ``True``.
+    linear : bool, optional
+        If ``True``, measure text in linear metrics mode (see
+        :func:`set_linear_metrics`).  Ignored if :data:`context` is specified.
+
+        If not specified, use the default linear metrics mode.
+    context : MeasurementContext, optional
+        Measurement context to lay out text with.
+
+        If not specified, use the measurement context of the calling thread.
+
+    Returns
+    -------
+    FontSolution
+        Largest fitting font size, line extents at that font size, and the
+        number of sizes measured.
+
+        If no size down to one Pango unit fits, return the solution for one
+        Pango unit with :attr:`FontSolution.fits` set to ``False``.
+    '''
+    if context is None:
+        context = get_measurement_context(linear)
+    linear = context.linear
+    font = font.copy()
+    text = list(text)
+    # Solve using unique lines, and scatter sizes back to all lines at the end.
+    unique, inverse = _unique_inverse(text)
+    all_lines = np.arange(len(unique))
+
+    def _unique_limits(limit):
+        # Limit each unique line to the smallest limit of any of its repeats.
+        if limit is None or not np.ndim(limit):
+            return limit
+        limits = np.full(len(unique), np.inf)
+        np.minimum.at(limits, inverse, np.asarray(limit, dtype=float))
+        return limits
+
+    width = _unique_limits(width)
+    height = _unique_limits(height)
+    iterations = [0]
+
+    def _measure(size_i, index):
+        iterations[0] += 1
+        font.set_size(int(size_i))
+        return np.array([context.measure(unique[j], font) for j in index],
+                        dtype=float).reshape(-1, 2)
+
+    def _limits(index=None):
+        # Width and height limits of the lines in `index` (or of all lines, if
+        # `index` is `None`).
+        if index is None:
+            return width, height
+        return tuple(limit_i[index] if np.ndim(limit_i) else limit_i
+                     for limit_i in (width, height))
+
+    def _overflow(sizes, scale=1, index=None):
+        # `sizes` are sizes of the lines in `index` (or of all lines, if
+        # `index` is `None`).
+        overflow = np.zeros(sizes.shape[0], dtype=bool)
+        for i, limit_i in enumerate(_limits(index)):
+            if limit_i is not None:
+                overflow |= sizes[:, i] > scale * limit_i
+        return overflow
+
+    def _extents(sizes):
+        return TextExtents(text, sizes[inverse, 0], sizes[inverse, 1])
+
+    if size is None:
+        size = font.get_size() or 12 * pango.SCALE
+    size = int(min(max(size, 1), max_size))
+
+    # The largest fitting size is bracketed by `lower` (fits) and `upper`
+    # (does not fit).  `lower_sizes` holds the sizes of **all** lines at
+    # `lower`, or `None` if only the critical lines have been measured.
+    if estimates is None:
+        sizes = _measure(size, all_lines)
+        critical = _critical_lines(sizes, width, height, margin)
+    else:
+        # Estimated size of each unique line at 1 pt.
+        estimated = np.empty((len(unique), 2), dtype=float)
+        estimated[inverse, 0] = estimates.width
+        estimated[inverse, 1] = estimates.height
+        if slack is not None:
+            unique_slack = np.zeros(len(unique))
+            unique_slack[inverse] = slack
+        critical = _critical_lines(estimated, width, height, margin)
+        sizes = _measure(size, critical)
+    sizes_index = None if estimates is None else critical
+    if _overflow(sizes, index=sizes_index).any():
+        lower, lower_sizes, upper = None, None, size
+    else:
+        lower, upper = size, None
+        lower_sizes = sizes if estimates is None else None
+
+    # Text extents are (approximately) proportional to font size, so predict
+    # the largest fitting size from the sizes measured at the initial size.
+    ratios = []
+    for i, limit_i in enumerate(_limits(sizes_index)):
+        valid_i = sizes[:, i] > 0
+        if limit_i is not None and valid_i.any():
+            limit_i = np.broadcast_to(limit_i, valid_i.shape)[valid_i]
+            ratios.append((limit_i / sizes[valid_i, i]).min())
+    if not predict and lower is not None and lower < max_size:
+        # Size is expected to be the solution, so check the next larger size.
+        if _overflow(_measure(lower + 1, critical), index=critical).any():
+            upper = lower + 1
+        else:
+            lower, lower_sizes = lower + 1, None
+    elif not predict and upper is not None and upper > 1:
+        # Size is expected to be just too large, so check the next smaller
+        # size.
+        if _overflow(_measure(upper - 1, critical), index=critical).any():
+            upper = upper - 1
+        else:
+            lower, lower_sizes = upper - 1, None
+    if lower is not None and upper is not None and upper - lower <= 1:
+        first_step = 1
+    elif ratios:
+        predicted = int(min(max(size * min(ratios), 1), max_size))
+        if linear:
+            # Extents are exactly proportional to font size, so the predicted
+            # size is the solution (subject to verification).
+            if predicted != size:
+                lower, lower_sizes, upper = predicted, None, predicted + 1
+            elif lower is not None:
+                upper = lower + 1
+        elif predicted != size:
+            if _overflow(_measure(predicted, critical), index=critical).any():
+                if upper is None or predicted < upper:
+                    upper = predicted
+                    if lower is not None and lower >= upper:
+                        lower, lower_sizes = None, None
+            elif lower is None or predicted > lower:
+                lower, lower_sizes = predicted, None
+                if upper is not None and upper <= lower:
+                    upper = None
+        # The solution is expected to be within about a pixel (of the
+        # largest measured extent) of the predicted size, since hinted
+        # extents are rounded to whole pixels.
+        first_step = max(int(size / sizes.max()), 1)
+    else:
+        first_step = max(size // 100, 1)
+
+    while True:
+        # Step away from the known bound in geometrically increasing steps
+        # until the largest fitting size is bracketed.
+        step = first_step
+        while upper is None and lower < max_size:
+            size_i = min(lower + step, max_size)
+            if _overflow(_measure(size_i, critical), index=critical).any():
+                upper = size_i
+            else:
+                lower, lower_sizes = size_i, None
+            step *= 2
+        while lower is None and upper > 1:
+            size_i = max(upper - step, 1)
+            if _overflow(_measure(size_i, critical), index=critical).any():
+                upper = size_i
+            else:
+                lower, lower_sizes = size_i, None
+            step *= 2
+        if lower is None:
+            # Text does not fit, even at the smallest possible font size.
+            return FontSolution(upper, _extents(_measure(upper, all_lines)),
+                                False, iterations[0])
+
+        # Bisect bracket down to a resolution of one Pango unit.
+        while upper is not None and upper - lower > 1:
+            size_i = (lower + upper) // 2
+            if _overflow(_measure(size_i, critical), index=critical).any():
+                upper = size_i
+            else:
+                lower, lower_sizes = size_i, None
+
+        if lower_sizes is None:
+            # Verify solution against all lines (or only lines that may not
+            # fit, based on the estimates).
+            if estimates is None or tolerance is None:
+                lower_sizes = _measure(lower, all_lines)
+            else:
+                lower_sizes = estimated * (lower / float(pango.SCALE))
+                bounds = lower_sizes.copy()
+                if slack is not None:
+                    bounds[:, 0] += (1 - tolerance) * unique_slack
+                verify = np.union1d(critical,
+                                    np.flatnonzero(_overflow(bounds,
+                                                             1 - tolerance)))
+                lower_sizes[verify] = _measure(lower, verify)
+            overflow = _overflow(lower_sizes)
+            if overflow.any():
+                critical = np.union1d(critical, np.flatnonzero(overflow))
+                lower, lower_sizes, upper = None, None, lower
+                first_step = 1
+                continue
+        return FontSolution(lower, _extents(lower_sizes), True,
+                            iterations[0])
+
+
+def _content_hash(text):
+    '''
+    Returns
+    -------
+    str
+        SHA-1 digest of the lines of :data:`text`.
+    '''
+    digest = hashlib.sha1()
+    for text_i in text:
+        digest.update(text_i.encode('utf8') if isinstance(text_i, unicode)
+                      else text_i)
+        digest.update(b'\0')
+    return digest.digest()
+
+
+def _fit_cache_key(text, font, width, height, line_spacing, linear):
+    return (_content_hash(text), len(text), font.to_string(), width, height,
+            line_spacing, linear)
+
+
+def _recent_fit_key(text, font, width, height, line_spacing, linear):
+    return (len(text), font.to_string(), width, height, line_spacing, linear)
+
+
+def _get_fit(key, text):
+    '''
+    Returns
+    -------
+    int, TextExtents
+        Cached font size (in Pango units) and line extents, or ``None`` if no
+        fit is cached for :data:`key`.
+    '''
+    fit = _fit_cache.get(key)
+    if fit is None:
+        return None
+    size, width, height = fit
+    return size, TextExtents(text, width, height)
+
+
+def _put_fit(key, size, extents):
+    width = extents.width.copy()
+    height = extents.height.copy()
+    # Cached arrays are shared by all cache hits.
+    width.flags.writeable = False
+    height.flags.writeable = False
+    _fit_cache.put(key, (size, width, height))
+
+
+def configure_fit_cache(maxsize):
+    '''
+    Set the maximum number of fitted text results (including table layouts)
+    to cache.
+
+    Parameters
+    ----------
+    maxsize : int or None
+        Maximum number of cached results.  If ``None``, the cache is
+        unbounded.  If ``0``, caching is disabled.
+    '''
+    _fit_cache.resize(maxsize)
+
+
+def clear_fit_cache():
+    '''
+    Remove all cached fitted text results (including recent solutions used to
+    warm start fitting) and reset cache statistics.
+    '''
+    _fit_cache.clear()
+    _recent_fits.clear()
+
+
+def fit_cache_info():
+    '''
+    Returns
+    -------
+    docket.cache.CacheInfo
+        Fitted text cache hit, miss, and eviction counts, maximum size, and
+        current size.
+    '''
+    return _fit_cache.info()
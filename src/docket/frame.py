@@ -0,0 +1,116 @@
+# coding: utf-8
+'''
+Convert data frame columns to text for rendering.
+'''
+import numpy as np
+
+from .measure import _unique_inverse
+
+
+__all__ = ['format_column', 'format_frame']
+
+
+def _plain_dtype(series):
+    '''
+    Returns
+    -------
+    bool
+        ``True`` if :data:`series` is a plain numpy numeric, boolean, or
+        object column (i.e., values of ``series.values.tolist()`` are
+        formatted the same as the values of the series).
+    '''
+    from pandas.api import types
+
+    return (not types.is_extension_array_dtype(series) and
+            not types.is_datetime64_any_dtype(series) and
+            not types.is_timedelta64_dtype(series) and
+            (types.is_numeric_dtype(series) or
+             types.is_object_dtype(series)))
+
+
+def _format_values(series, format=None):
+    '''
+    Returns
+    -------
+    list
+        Text of each value of a (non-categorical) series.
+    '''
+    from pandas.api import types
+
+    if callable(format):
+        return map(format, series)
+    if format is None:
+        if _plain_dtype(series):
+            # Same as `str(value)` for each value, but without creating a
+            # series of strings.
+            return map(str, series.values.tolist())
+        return series.map(str).tolist()
+    if (types.is_datetime64_any_dtype(series) or
+            types.is_period_dtype(series)):
+        return series.dt.strftime(format).tolist()
+    if _plain_dtype(series) and types.is_numeric_dtype(series):
+        return np.char.mod(format, series.values).tolist()
+    return [format % value_i for value_i in series.tolist()]
+
+
+def format_column(series, format=None):
+    '''
+    Convert a data frame column to text.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Column of values.
+    format : str or callable, optional
+        Format of each value:
+
+         - ``None``: ``str(value)``.
+         - ``str``: ``strftime`` format for datetime (or period) columns,
+           or ``%``-style format (e.g., ``"%.2f"``) otherwise.  Numeric
+           columns are formatted using :func:`numpy.char.mod`.
+         - callable: called with each value.
+
+    Returns
+    -------
+    list or pandas.Categorical
+        Text of each value.
+
+        If :data:`series` is categorical, each category is formatted once
+        and a categorical of text is returned (missing values are formatted
+        as ``"nan"``).
+    '''
+    if series.dtype.name == 'category':
+        import pandas as pd
+
+        categories = _format_values(pd.Series(series.cat.categories), format)
+        # Missing values have code -1, i.e., the last category.
+        categories = np.array(categories + ['nan'], dtype=object)
+        # Distinct categories may have the same text (mixed byte strings and
+        # unicode strings are not comparable, so do not sort).
+        unique, inverse = _unique_inverse(categories)
+        return pd.Categorical.from_codes(inverse[series.cat.codes.values],
+                                         unique)
+    return _format_values(series, format)
+
+
+def format_frame(df_data, formats=None):
+    '''
+    Convert each column of a data frame to text.
+
+    Parameters
+    ----------
+    df_data : pandas.DataFrame
+        Table of values.
+    formats : str, callable, or dict, optional
+        Format for all columns, or formats keyed by column name (see
+        :func:`format_column`).
+
+    Returns
+    -------
+    list
+        Text of each column (see :func:`format_column`).
+    '''
+    if not isinstance(formats, dict):
+        formats = {column_i: formats for column_i in df_data.columns}
+    return [format_column(df_data[column_i], formats.get(column_i))
+            for column_i in df_data.columns]
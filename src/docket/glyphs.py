@@ -0,0 +1,252 @@
+# coding: utf-8
+'''
+Per-font glyph advance tables for estimating rendered text extents without
+laying out each line of text.
+'''
+import struct
+import threading
+import types
+
+import numpy as np
+import pango
+
+from .cache import LRUCache
+from .measure import TextExtents, _resolve_linear, get_measurement_context
+
+
+__all__ = ['GlyphAdvanceTable', 'REFERENCE_SIZE', 'estimate_extents',
+           'get_glyph_table']
+
+
+#: Font size (in pt) at which glyph advances are measured.
+REFERENCE_SIZE = 64
+
+#: Glyph advance tables keyed by font description string (at
+#: :data:`REFERENCE_SIZE`) and linear metrics mode.
+_glyph_tables = LRUCache(maxsize=64)
+
+
+def _code_points(text):
+    '''
+    Returns
+    -------
+    numpy.array, numpy.array
+        Unicode code points of all lines of :data:`text` (concatenated), and
+        the number of code points in each line.
+    '''
+    encoded = [(text_i.decode('utf8') if isinstance(text_i, str) else
+                unicode(text_i)).encode('utf-32-le') for text_i in text]
+    lengths = np.array([len(encoded_i) // 4 for encoded_i in encoded],
+                       dtype=int)
+    codes = np.frombuffer(b''.join(encoded), dtype='<u4').astype(np.int64)
+    return codes, lengths
+
+
+def _to_unicode(codes):
+    return b''.join(struct.pack('<I', code_i)
+                    for code_i in codes).decode('utf-32-le')
+
+
+def _lookup(keys, values, query):
+    return values[np.searchsorted(keys, query)]
+
+
+class GlyphAdvanceTable(object):
+    '''
+    Table of character advances and pair kerning for a font.
+
+    Advances are measured (at :data:`REFERENCE_SIZE`) the first time each
+    character is encountered, and kerning is measured the first time each
+    pair of adjacent characters is encountered.  Rendered text widths are
+    then estimated for whole arrays of text as the sum of character advances
+    and pair kerning, scaled linearly to the requested font size.
+
+    Estimates do not account for hinting, ligatures, or complex text shaping,
+    so they should be verified by measuring the rendered text (e.g., using
+    :func:`docket.measure_many`) where exact sizes are required.
+
+    Parameters
+    ----------
+    font : pango.FontDescription or str
+        Pango font description or string, e.g., ``"Serif"`` (size is
+        ignored).
+    kerning : bool, optional
+        If ``True``, include pair kerning in width estimates.
+    linear : bool, optional
+        If ``True``, measure glyphs in linear metrics mode (see
+        :func:`docket.set_linear_metrics`).
+    '''
+    def __init__(self, font, kerning=True, linear=False):
+        if isinstance(font, types.StringTypes):
+            font = pango.FontDescription(font)
+        else:
+            font = font.copy()
+        font.set_size(REFERENCE_SIZE * pango.SCALE)
+        self.font = font
+        self.kerning = kerning
+        self.linear = linear
+        self._lock = threading.Lock()
+        self._codes = np.array([], dtype=np.int64)
+        self._advances = np.array([], dtype=float)
+        self._heights = np.array([], dtype=float)
+        self._pairs = np.array([], dtype=np.int64)
+        self._kerns = np.array([], dtype=float)
+        # Height of an empty line.
+        self._height = self._context().measure('', self.font,
+                                               cache=False)[1]
+
+    def __len__(self):
+        return self._codes.size
+
+    def _context(self):
+        return get_measurement_context(self.linear)
+
+    def _add_characters(self, codes):
+        # Measure advance and height of each character not in the table.
+        codes = np.setdiff1d(codes, self._codes)
+        if not codes.size:
+            return
+        context = self._context()
+        sizes = np.array([context.measure(_to_unicode([code_i]), self.font,
+                                          cache=False)
+                          for code_i in codes.tolist()]).reshape(-1, 2)
+        order = np.argsort(np.concatenate([self._codes, codes]),
+                           kind='mergesort')
+        self._codes = np.concatenate([self._codes, codes])[order]
+        self._advances = np.concatenate([self._advances, sizes[:, 0]])[order]
+        self._heights = np.concatenate([self._heights, sizes[:, 1]])[order]
+
+    def _add_pairs(self, pairs):
+        # Measure kerning of each pair of characters not in the table.
+        pairs = np.setdiff1d(pairs, self._pairs)
+        if not pairs.size:
+            return
+        context = self._context()
+        first, second = pairs >> 21, pairs & 0x1fffff
+        widths = np.array([context.measure(_to_unicode(pair_i), self.font,
+                                           cache=False)[0]
+                           for pair_i in zip(first.tolist(),
+                                             second.tolist())])
+        kerns = (widths - _lookup(self._codes, self._advances, first) -
+                 _lookup(self._codes, self._advances, second))
+        order = np.argsort(np.concatenate([self._pairs, pairs]),
+                           kind='mergesort')
+        self._pairs = np.concatenate([self._pairs, pairs])[order]
+        self._kerns = np.concatenate([self._kerns, kerns])[order]
+
+    def estimate(self, text, size):
+        '''
+        Estimate rendered extents of text.
+
+        Parameters
+        ----------
+        text : str or list-like
+            Lines of text.
+        size : float
+            Font size (in pt).
+
+        Returns
+        -------
+        TextExtents
+            Estimated rendered size of each line of :data:`text` (in pixels).
+        '''
+        if isinstance(text, types.StringTypes):
+            text = [text]
+        text = list(text)
+        codes, lengths = _code_points(text)
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+        nonempty = lengths > 0
+
+        # Each position (except the last character of each line) starts a
+        # pair of adjacent characters.
+        pair_mask = np.ones(codes.size, dtype=bool)
+        pair_mask[ends[nonempty] - 1] = False
+        pairs = (codes[:-1] << 21) | codes[1:]
+        pairs = pairs[pair_mask[:-1]]
+
+        with self._lock:
+            self._add_characters(np.unique(codes))
+            if self.kerning:
+                self._add_pairs(np.unique(pairs))
+            advances = _lookup(self._codes, self._advances, codes)
+            heights = _lookup(self._codes, self._heights, codes)
+            if self.kerning and pairs.size:
+                advances[pair_mask] += _lookup(self._pairs, self._kerns,
+                                               pairs)
+
+        # Sum advances of each line.
+        cumulative = np.concatenate([[0], np.cumsum(advances)])
+        widths = cumulative[ends] - cumulative[starts]
+        # Line height is height of the tallest character in the line.
+        line_heights = np.full(len(text), self._height)
+        if nonempty.any():
+            line_heights[nonempty] = np.maximum.reduceat(heights,
+                                                         starts[nonempty])
+        scale = float(size) / REFERENCE_SIZE
+        return TextExtents(text, widths * scale, line_heights * scale)
+
+
+def get_glyph_table(font, linear=None):
+    '''
+    Parameters
+    ----------
+    font : pango.FontDescription or str
+        Pango font description or string, e.g., ``"Serif"`` (size is
+        ignored).
+    linear : bool, optional
+        If ``True``, return table for linear metrics mode (see
+        :func:`docket.set_linear_metrics`).
+
+        If not specified, use the default linear metrics mode.
+
+    Returns
+    -------
+    GlyphAdvanceTable
+        Cached glyph advance table for :data:`font`.
+    '''
+    if isinstance(font, types.StringTypes):
+        font = pango.FontDescription(font)
+    else:
+        font = font.copy()
+    font.set_size(REFERENCE_SIZE * pango.SCALE)
+    linear = _resolve_linear(linear)
+    key = (font.to_string(), linear)
+    table = _glyph_tables.get(key)
+    if table is None:
+        table = GlyphAdvanceTable(font, linear=linear)
+        _glyph_tables.put(key, table)
+    return table
+
+
+def estimate_extents(text, font, linear=None):
+    '''
+    Estimate rendered extents of text without laying out each line.
+
+    Parameters
+    ----------
+    text : str or list-like
+        Lines of text.
+    font : pango.FontDescription or str
+        Pango font description or string, e.g., ``"Serif 12"``.
+    linear : bool, optional
+        If ``True``, estimate extents in linear metrics mode (see
+        :func:`docket.set_linear_metrics`).
+
+        If not specified, use the default linear metrics mode.
+
+    Returns
+    -------
+    TextExtents
+        Estimated rendered size of each line of :data:`text` (in pixels).
+
+    See also
+    --------
+    :class:`GlyphAdvanceTable`
+    '''
+    if isinstance(font, types.StringTypes):
+        font = pango.FontDescription(font)
+    if font.get_size() == 0:
+        raise ValueError('Font size must be specified.')
+    return get_glyph_table(font, linear).estimate(text, font.get_size() /
+                                                  float(pango.SCALE))
@@ -0,0 +1,458 @@
+# coding: utf-8
+'''
+Reusable cairo/Pango contexts for measuring rendered text extents.
+'''
+import threading
+import types
+
+import cairo
+import numpy as np
+import pango
+import pangocairo
+
+from .cache import LRUCache, StripedLRUCache
+
+__all__ = ['MeasurementContext', 'TextExtents', 'clear_extent_cache',
+           'configure_extent_cache', 'extent_cache_info',
+           'get_linear_metrics', 'get_measurement_context', 'measure_many',
+           'release_measurement_context', 'set_linear_metrics']
+
+
+#: Measured ``(width, height)`` keyed by ``(font description, text, linear
+#: metrics)``.
+_extent_cache = StripedLRUCache(maxsize=16384)
+
+#: Default linear metrics mode (see :func:`set_linear_metrics`).
+_linear_metrics = False
+
+
+def set_linear_metrics(enabled):
+    '''
+    Set default linear metrics mode.
+
+    In linear metrics mode, hint metrics are disabled (enabling subpixel glyph
+    positioning), so rendered text extents scale linearly with font size and
+    the fitted font size can be computed from a single measurement.
+
+    Text measured or rendered in linear metrics mode may differ slightly from
+    text measured or rendered with hint metrics enabled.
+
+    Parameters
+    ----------
+    enabled : bool
+        If ``True``, measure and render text in linear metrics mode unless
+        explicitly disabled in a call (i.e., using ``linear=False``).
+    '''
+    global _linear_metrics
+    _linear_metrics = bool(enabled)
+
+
+def get_linear_metrics():
+    '''
+    Returns
+    -------
+    bool
+        Default linear metrics mode (see :func:`set_linear_metrics`).
+    '''
+    return _linear_metrics
+
+
+def _resolve_linear(linear):
+    return _linear_metrics if linear is None else bool(linear)
+
+
+def _linear_font_options():
+    '''
+    Returns
+    -------
+    cairo.FontOptions
+        Font options with hint metrics and hinting disabled.
+    '''
+    options = cairo.FontOptions()
+    options.set_hint_metrics(cairo.HINT_METRICS_OFF)
+    options.set_hint_style(cairo.HINT_STYLE_NONE)
+    return options
+
+
+def _apply_linear_metrics(layout):
+    '''
+    Disable hint metrics for a Pango layout created by a Pango cairo context.
+    '''
+    pangocairo.context_set_font_options(layout.get_context(),
+                                        _linear_font_options())
+    layout.context_changed()
+
+
+def _unique_inverse(text):
+    '''
+    Returns
+    -------
+    list, numpy.array
+        Unique lines of text (in order of first occurrence), and the index of
+        each line of :data:`text` in the unique lines (i.e., ``text[i] ==
+        unique[inverse[i]]``).
+    '''
+    # Hash (rather than sort) lines, since byte strings and unicode strings
+    # may not be comparable.
+    index = {}
+    unique = []
+    inverse = np.empty(len(text), dtype=int)
+    for i, text_i in enumerate(text):
+        j = index.get(text_i)
+        if j is None:
+            j = index[text_i] = len(unique)
+            unique.append(text_i)
+        inverse[i] = j
+    return unique, inverse
+
+
+class TextExtents(object):
+    '''
+    Rendered sizes of lines of text.
+
+    Attributes
+    ----------
+    text : list
+        Lines of text.
+    width : numpy.array
+        Rendered width of each line (in pixels).
+    height : numpy.array
+        Rendered height of each line (in pixels).
+    '''
+    __slots__ = ('text', 'width', 'height')
+
+    def __init__(self, text, width, height):
+        self.text = text
+        self.width = np.ascontiguousarray(width, dtype=float)
+        self.height = np.ascontiguousarray(height, dtype=float)
+
+    def __len__(self):
+        return len(self.text)
+
+    def __repr__(self):
+        return '<TextExtents: %d lines>' % len(self)
+
+    def max(self):
+        '''
+        Returns
+        -------
+        numpy.array
+            Maximum ``(width, height)`` of all lines (in pixels).
+        '''
+        if not len(self):
+            return np.zeros(2)
+        return np.array([self.width.max(), self.height.max()])
+
+    def to_frame(self):
+        '''
+        Returns
+        -------
+        pandas.DataFrame
+            Data frame containing ``width`` and ``height`` columns, with each
+            row indexed by the corresponding line of text.
+        '''
+        import pandas as pd
+
+        return pd.DataFrame({'width': self.width, 'height': self.height},
+                            columns=['width', 'height'], index=self.text)
+
+
+class MeasurementContext(object):
+    '''
+    Cairo/Pango context used to measure the rendered size of text.
+
+    Pango requires a cairo surface to lay text out against, but the size of
+    the surface has no effect on the measured text extents.  A single 1x1
+    surface, cairo context, and Pango cairo context are allocated when the
+    measurement context is opened and are reused for every measurement until
+    the context is closed.  Likewise, one Pango layout is kept for each
+    (recently used) font, and only its text is updated for each measurement.
+
+    Cairo and Pango objects must not be shared between threads.  Use
+    :func:`get_measurement_context` to get a context owned by the calling
+    thread.
+
+    Parameters
+    ----------
+    linear : bool, optional
+        If ``True``, measure text in linear metrics mode (see
+        :func:`set_linear_metrics`).
+
+    Example
+    -------
+
+        >>> with MeasurementContext() as context:
+        ...     width, height = context.measure('hello, world!', 'Serif 12')
+    '''
+    def __init__(self, linear=False):
+        self.linear = linear
+        self._surface = None
+        self._context = None
+        self._pangocairo_context = None
+        #: Reusable Pango layouts keyed by font description.
+        self._layouts = LRUCache(maxsize=16)
+        self.open()
+
+    @property
+    def closed(self):
+        return self._pangocairo_context is None
+
+    def open(self):
+        '''
+        Allocate surface and contexts (no-op if context is already open).
+        '''
+        if not self.closed:
+            return
+        self._surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, 1, 1)
+        self._context = cairo.Context(self._surface)
+        self._pangocairo_context = pangocairo.CairoContext(self._context)
+        self._pangocairo_context.set_antialias(cairo.ANTIALIAS_DEFAULT)
+        if self.linear:
+            self._context.set_font_options(_linear_font_options())
+
+    def close(self):
+        '''
+        Release surface and contexts.
+
+        The context may be re-opened afterwards using :meth:`open`.
+        '''
+        if self.closed:
+            return
+        self._layouts.clear()
+        self._pangocairo_context = None
+        self._context = None
+        self._surface.finish()
+        self._surface = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def layout(self, text, font):
+        '''
+        Parameters
+        ----------
+        text : str
+            Text to lay out.
+        font : pango.FontDescription or str
+            Pango font description or string, e.g., ``"Serif 12"``.
+
+        Returns
+        -------
+        pango.Layout
+            Layout of :data:`text` using :data:`font`.
+        '''
+        if self.closed:
+            raise RuntimeError('Measurement context is closed.')
+        if isinstance(font, types.StringTypes):
+            font = pango.FontDescription(font)
+        layout = self._pangocairo_context.create_layout()
+        if self.linear:
+            _apply_linear_metrics(layout)
+        layout.set_font_description(font)
+        layout.set_text(text)
+        return layout
+
+    def _shared_layout(self, font):
+        '''
+        Returns
+        -------
+        pango.Layout
+            Layout reused for every measurement using :data:`font` (text is
+            set by the caller).
+        '''
+        key = font.to_string()
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = self.layout('', font)
+            self._layouts.put(key, layout)
+        return layout
+
+    def measure(self, text, font, cache=True):
+        '''
+        Parameters
+        ----------
+        text : str
+            Text to measure.
+        font : pango.FontDescription or str
+            Pango font description or string, e.g., ``"Serif 12"``.
+        cache : bool, optional
+            If ``True``, look up (and store) the measured size in the text
+            extent cache (see :func:`configure_extent_cache`).
+
+        Returns
+        -------
+        numpy.array
+            Rendered ``(width, height)`` of :data:`text` (in pixels).
+        '''
+        if self.closed:
+            raise RuntimeError('Measurement context is closed.')
+        if isinstance(font, types.StringTypes):
+            font = pango.FontDescription(font)
+        if cache:
+            key = (font.to_string(), text, self.linear)
+            size = _extent_cache.get(key)
+            if size is not None:
+                return np.array(size)
+        layout = self._shared_layout(font)
+        layout.set_text(text)
+        size = np.array(layout.get_size(), dtype=float) / pango.SCALE
+        if cache:
+            _extent_cache.put(key, tuple(size))
+        return size
+
+    def measure_many(self, text, font, cache=True):
+        '''
+        Parameters
+        ----------
+        text : list-like
+            Lines of text to measure.
+        font : pango.FontDescription or str
+            Pango font description or string, e.g., ``"Serif 12"``.
+        cache : bool, optional
+            If ``True``, look up (and store) the measured sizes in the text
+            extent cache (see :func:`configure_extent_cache`).
+
+        Returns
+        -------
+        TextExtents
+            Rendered size of each line of :data:`text` (in pixels).
+
+            Repeated lines are only measured once.
+        '''
+        if isinstance(font, types.StringTypes):
+            font = pango.FontDescription(font)
+        text = list(text)
+        # Measure each unique line once.
+        unique, inverse = _unique_inverse(text)
+        sizes = np.empty((2, len(unique)), dtype=float)
+        for i, text_i in enumerate(unique):
+            sizes[:, i] = self.measure(text_i, font, cache=cache)
+        return TextExtents(text, sizes[0][inverse], sizes[1][inverse])
+
+    def warm(self, fonts, text='0123456789abcdefghijklmnopqrstuvwxyz'):
+        '''
+        Load the specified fonts (e.g., to pay fontconfig lookup cost upfront
+        in a long-running service).
+
+        Parameters
+        ----------
+        fonts : list-like
+            Pango font descriptions or strings.
+        text : str, optional
+            Sample text to lay out with each font.
+        '''
+        for font_i in fonts:
+            self.measure(text, font_i)
+
+
+_thread_local = threading.local()
+
+
+def get_measurement_context(linear=None):
+    '''
+    Parameters
+    ----------
+    linear : bool, optional
+        If ``True``, return context for linear metrics mode (see
+        :func:`set_linear_metrics`).
+
+        If not specified, use the default linear metrics mode.
+
+    Returns
+    -------
+    MeasurementContext
+        Open measurement context owned by the calling thread.
+
+        The context is created on first use and is reused by subsequent calls
+        from the same thread until :func:`release_measurement_context` is
+        called.
+    '''
+    linear = _resolve_linear(linear)
+    contexts = getattr(_thread_local, 'contexts', None)
+    if contexts is None:
+        contexts = _thread_local.contexts = {}
+    context = contexts.get(linear)
+    if context is None:
+        context = contexts[linear] = MeasurementContext(linear=linear)
+    else:
+        context.open()
+    return context
+
+
+def release_measurement_context():
+    '''
+    Close and discard the measurement contexts owned by the calling thread (if
+    any).
+    '''
+    contexts = getattr(_thread_local, 'contexts', {})
+    for context_i in contexts.values():
+        context_i.close()
+    contexts.clear()
+
+
+def measure_many(text, font='Serif 12', context=None, linear=None):
+    '''
+    Parameters
+    ----------
+    text : str or list-like
+        Text to measure.
+
+        If a list is provided, measure the rendered size of each entry in the
+        list.
+    font : pango.FontDescription or str, optional
+        Pango font description or string, e.g., ``"Serif", "Arial 14"``, etc.
+    context : MeasurementContext, optional
+        Measurement context to lay out text with.
+
+        If not specified, use the measurement context of the calling thread.
+    linear : bool, optional
+        If ``True``, measure text in linear metrics mode (see
+        :func:`set_linear_metrics`).  Ignored if :data:`context` is specified.
+
+        If not specified, use the default linear metrics mode.
+
+    Returns
+    -------
+    TextExtents
+        Rendered size of each line of :data:`text` (in pixels).
+    '''
+    if isinstance(text, types.StringTypes):
+        text = [text]
+    if context is None:
+        context = get_measurement_context(linear)
+    return context.measure_many(text, font)
+
+
+def configure_extent_cache(maxsize):
+    '''
+    Set the maximum number of measured text extents to cache.
+
+    Parameters
+    ----------
+    maxsize : int or None
+        Maximum number of ``(font description, text)`` entries.  If ``None``,
+        the cache is unbounded.  If ``0``, caching is disabled.
+    '''
+    _extent_cache.resize(maxsize)
+
+
+def clear_extent_cache():
+    '''
+    Remove all cached text extents and reset cache statistics.
+    '''
+    _extent_cache.clear()
+
+
+def extent_cache_info():
+    '''
+    Returns
+    -------
+    docket.cache.CacheInfo
+        Text extent cache hit, miss, and eviction counts, maximum size, and
+        current size.
+    '''
+    return _extent_cache.info()
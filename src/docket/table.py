@@ -0,0 +1,523 @@
+# coding: utf-8
+'''
+Lay out and draw tables of text with a shared font size.
+'''
+from collections import namedtuple
+import types
+
+import cairo
+import numpy as np
+import pango
+import pangocairo
+
+from .fit import _content_hash, _fit_cache, solve_font_size
+from .glyphs import get_glyph_table
+from .measure import (TextExtents, _apply_linear_metrics, _linear_font_options,
+                      _resolve_linear, get_measurement_context)
+
+
+__all__ = ['TableLayout', 'allocate_column_widths', 'draw_table',
+           'layout_table']
+
+
+class TableLayout(namedtuple('TableLayout', ['font', 'extents',
+                                             'column_widths',
+                                             'column_offsets', 'line_height',
+                                             'width', 'height'])):
+    '''
+    Table layout.
+
+    Attributes
+    ----------
+    font : pango.FontDescription
+        Font description (including fitted font size) shared by all columns.
+    extents : list
+        Rendered size of each cell at :attr:`font` (in pixels), as one
+        :class:`TextExtents` per column.
+    column_widths : numpy.array
+        Width of each column, including padding (in pixels).
+    column_offsets : numpy.array
+        Horizontal offset of each column (in pixels).
+    line_height : float
+        Height of each row (in pixels).
+    width : float
+        Width of table (in pixels).
+    height : float
+        Height of table (in pixels).
+    '''
+    __slots__ = ()
+
+
+#: Maximum error (in pixels) per character of estimated widths in hinted
+#: (i.e., non-linear) metrics mode, where the advance of each glyph is rounded
+#: to a whole pixel.
+_ROUNDING_ERROR = .5
+
+
+def _rounding_error(text, linear):
+    '''
+    Returns
+    -------
+    numpy.array or float
+        Maximum rounding error of the estimated width of each line of
+        :data:`text` (in pixels, at any font size), or 0 in linear metrics
+        mode.
+    '''
+    if linear:
+        return 0.
+    # (Length of a UTF-8 byte string is at least its number of characters.)
+    return _ROUNDING_ERROR * np.array([len(text_i) for text_i in text],
+                                      dtype=float)
+
+
+def _width_bounds(text, estimated, tolerance, linear):
+    '''
+    Returns
+    -------
+    numpy.array
+        Upper bound of the rendered width of each line of :data:`text` (in
+        pixels), i.e., the estimated width widened by :data:`tolerance` (for
+        kerning and shaping) plus the rounding error of each glyph advance.
+    '''
+    return estimated * (1 + tolerance) + _rounding_error(text, linear)
+
+
+def _widest(text, bounds, font, context):
+    '''
+    Find the widest line by measuring lines in decreasing order of upper bound
+    width, until no remaining line can be wider than the widest measured line.
+
+    Parameters
+    ----------
+    text : list
+        Lines of text.
+    bounds : numpy.array
+        Upper bound of the width of each line at the size of :data:`font`
+        (see :func:`_width_bounds`).
+    font : pango.FontDescription
+        Pango font description.
+    context : MeasurementContext
+        Measurement context to lay out text with.
+
+    Returns
+    -------
+    float
+        Width of widest line (in pixels), or 0 if :data:`text` is empty.
+    '''
+    widest = 0.
+    for i in np.argsort(-bounds, kind='mergesort'):
+        if bounds[i] <= widest:
+            break
+        widest = max(widest, context.measure(text[i], font)[0])
+    return widest
+
+
+def allocate_column_widths(natural, width, min_widths=None,
+                           max_widths=None):
+    '''
+    Allocate column widths to maximize the font size shared by all columns.
+
+    Text widths are (approximately) proportional to font size, so at a
+    relative font scale ``s``, column ``j`` must be at least
+    ``natural[j] * s`` wide.  The largest scale at which the columns fit into
+    :data:`width` (subject to the minimum and maximum column widths) is
+    computed directly from the breakpoints of the (piecewise linear) total
+    width, and any remaining width is distributed in proportion to the
+    natural widths.
+
+    Parameters
+    ----------
+    natural : array-like
+        Width of the widest cell of each column at the reference font size.
+    width : float
+        Total width of all columns.
+    min_widths : float or array-like, optional
+        Minimum width of each column.
+    max_widths : float or array-like, optional
+        Maximum width of each column.
+
+    Returns
+    -------
+    numpy.array, float
+        Width of each column, and the largest font scale relative to the
+        reference font size (``inf`` if no column has any text).
+
+    Raises
+    ------
+    ValueError
+        If the minimum column widths do not fit into :data:`width`.
+    '''
+    natural = np.asarray(natural, dtype=float)
+    count = natural.size
+    min_widths = np.broadcast_to(0. if min_widths is None else min_widths,
+                                 (count, )).astype(float)
+    max_widths = np.broadcast_to(np.inf if max_widths is None else
+                                 max_widths, (count, )).astype(float)
+    if min_widths.sum() > width:
+        raise ValueError('Minimum column widths (%s) exceed width (%s).' %
+                         (min_widths.sum(), width))
+
+    # Scale at which each column grows beyond its minimum width.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        breakpoints = np.where(natural > 0, min_widths / natural, np.inf)
+    order = np.argsort(breakpoints, kind='mergesort')
+    # With the `k` columns with the lowest breakpoints proportional to the
+    # scale (and the remaining columns at their minimum widths), the scale
+    # that fills the width is (width - fixed) / proportional.
+    proportional = np.cumsum(natural[order])
+    fixed = min_widths[order][::-1].cumsum()[::-1]
+    fixed = np.concatenate([fixed[1:], [0]])
+    # (Fall back to the lowest breakpoint if rounding error skips the
+    # solution, i.e., if the minimum widths fill the width.)
+    scale = breakpoints[order[0]] if count else np.inf
+    for k in xrange(count):
+        if proportional[k] <= 0:
+            continue
+        scale_k = (width - fixed[k]) / proportional[k]
+        if scale_k >= breakpoints[order[k]] and (k + 1 == count or
+                                                 scale_k <=
+                                                 breakpoints[order[k + 1]]):
+            scale = scale_k
+            break
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = min([scale] + (max_widths / natural)[natural > 0].tolist())
+
+    column_widths = np.minimum(np.maximum(natural * scale if
+                                          np.isfinite(scale) else
+                                          np.zeros(count), min_widths),
+                               max_widths)
+    # Distribute remaining width in proportion to natural widths (or equally),
+    # up to the maximum width of each column.
+    for i in xrange(count):
+        remaining = width - column_widths.sum()
+        open_ = column_widths < max_widths
+        if remaining <= 1e-9 or not open_.any():
+            break
+        weights = np.where(open_, natural, 0)
+        if weights.sum() <= 0:
+            weights = open_.astype(float)
+        column_widths = np.minimum(column_widths + remaining * weights /
+                                   weights.sum(), max_widths)
+    return column_widths, scale
+
+
+def layout_table(columns, width, font='Serif 12', column_padding=.1,
+                 height=None, line_spacing=1.5, linear=None, tolerance=.1,
+                 context=None, min_widths=None, max_widths=None,
+                 executor=None, parallel_threshold=10000):
+    '''
+    Fit columns of text into the specified width using a shared font size.
+
+    Column widths are allocated to maximize the shared font size, based on
+    the widest cell of each column at the size of :data:`font` (see
+    :func:`allocate_column_widths`), and the font size is solved for all
+    cells at once (see :func:`solve_font_size`).
+
+    Cell sizes are estimated from the glyph advances of the font (see
+    :class:`GlyphAdvanceTable`), and only the cells that may be the widest in
+    their column (or may not fit at the fitted size) are measured, so the
+    number of cells measured is nearly independent of the number of rows.
+
+    Parameters
+    ----------
+    columns : list
+        Text of each column, as list-like of strings or as a
+        :class:`pandas.Categorical` of strings (see :func:`format_column`),
+        in which case each category is only estimated and measured once.
+    width : float
+        Width of table (in pixels).
+    font : pango.FontDescription or str, optional
+        Pango font description or string, e.g., ``"Serif", "Arial 14"``, etc.
+
+        If no size is specified, measure reference sizes at 12 pt.
+    column_padding : float, optional
+        Fraction of total width to reserve for padding between columns.
+
+        Default: 0.1, i.e., 10%
+    height : float, optional
+        Height of table (in pixels).
+    line_spacing : float, optional
+        Line height relative to maximum text height.
+    linear : bool, optional
+        If ``True``, measure text in linear metrics mode (see
+        :func:`set_linear_metrics`).  Ignored if :data:`context` is specified.
+
+        If not specified, use the default linear metrics mode.
+    tolerance : float, optional
+        Relative error of estimated cell sizes (e.g., due to kerning and
+        shaping).  Cells with an estimated width (widened by this fraction,
+        plus half a pixel per character for rounding of hinted glyph
+        advances) of at least the widest measured cell in a column (or of the
+        column width at the fitted size) are measured.
+    context : MeasurementContext, optional
+        Measurement context to lay out text with.
+
+        If not specified, use the measurement context of the calling thread.
+    min_widths : float or array-like, optional
+        Minimum width of each column, excluding padding (in pixels).
+    max_widths : float or array-like, optional
+        Maximum width of each column, excluding padding (in pixels).
+    executor : object, optional
+        Executor used to estimate and measure columns in parallel, e.g., a
+        :class:`concurrent.futures.ThreadPoolExecutor` or
+        :class:`multiprocessing.Pool` (any object with a ``map`` method).
+        Each worker measures using its own measurement context.
+    parallel_threshold : int, optional
+        Minimum number of cells to use :data:`executor` for; smaller tables
+        are processed serially.
+
+    Returns
+    -------
+    TableLayout
+        Fitted font, cell extents, column widths and offsets, and table size.
+
+        Layouts are cached (see :func:`fit_cache_info`), and arrays of a
+        layout are read-only, since they are shared by all cache hits.
+    '''
+    if isinstance(font, types.StringTypes):
+        font = pango.FontDescription(font)
+    else:
+        font = font.copy()
+    if font.get_size() == 0:
+        font.set_size(12 * pango.SCALE)
+    if context is None:
+        context = get_measurement_context(linear)
+
+    columns = list(columns)
+    lengths = np.array([len(column_i) for column_i in columns], dtype=int)
+    cells = [cell_i for column_i in columns
+             for cell_i in np.asarray(column_i, dtype=object).tolist()]
+
+    key = ('table', _content_hash(cells), tuple(lengths), font.to_string(),
+           width, height, column_padding, line_spacing, context.linear,
+           tolerance, _limits_key(min_widths), _limits_key(max_widths))
+    cached = _fit_cache.get(key)
+    if cached is not None:
+        return cached._replace(font=cached.font.copy())
+    column_index = np.repeat(np.arange(len(columns)), lengths)
+    row_count = lengths.max() if lengths.size else 0
+
+    reference_size = font.get_size()
+    reference_pt = reference_size / float(pango.SCALE)
+
+    # Estimate size of each cell per pt (without laying out each cell), and
+    # find the widest cell of each column.  Columns are independent, so they
+    # may be processed in parallel.
+    args = [(column_i, font.to_string(), context.linear, tolerance)
+            for column_i in columns]
+    if executor is None or len(cells) < parallel_threshold:
+        results = map(_measure_column, args)
+    else:
+        results = list(executor.map(_measure_column, args))
+    estimates = TextExtents(cells,
+                            np.concatenate([[]] + [result_i[0] for result_i
+                                                   in results]),
+                            np.concatenate([[]] + [result_i[1] for result_i
+                                                   in results]))
+    natural = np.array([result_i[2] for result_i in results], dtype=float)
+    column_widths, scale = allocate_column_widths(natural,
+                                                  width / (1. +
+                                                           column_padding),
+                                                  min_widths, max_widths)
+
+    line_height = None
+    if height is not None and row_count:
+        line_height = height / (row_count * line_spacing)
+
+    if not cells:
+        extents = estimates
+    else:
+        # Predict the fitted size from the widest cells.
+        ratios = [scale] if np.isfinite(scale) else []
+        if line_height is not None and estimates.height.max() > 0:
+            ratios.append(line_height / (estimates.height.max() *
+                                         reference_pt))
+        size = (int(reference_size * min(ratios)) if ratios else
+                reference_size)
+        solution = solve_font_size(cells, font,
+                                   width=column_widths[column_index],
+                                   height=line_height, size=size,
+                                   estimates=estimates, tolerance=tolerance,
+                                   slack=_rounding_error(cells,
+                                                         context.linear),
+                                   predict=False, context=context)
+        font.set_size(solution.size)
+        extents = solution.extents
+        # Heights of cells that were not verified are estimates, so measure
+        # the tallest cell at the fitted size.
+        tallest = int(extents.height.argmax())
+        extents.height[tallest] = context.measure(cells[tallest], font)[1]
+
+    row_height = line_spacing * (extents.height.max() if cells else 0)
+    column_widths = column_widths * (1 + column_padding)
+    column_offsets = np.concatenate([[0], np.cumsum(column_widths)[:-1]])
+    ends = np.cumsum(lengths)
+    column_extents = [TextExtents(extents.text[start_i:end_i],
+                                  extents.width[start_i:end_i],
+                                  extents.height[start_i:end_i])
+                      for start_i, end_i in zip(ends - lengths, ends)]
+    # Cached arrays are shared by all cache hits.
+    for array_i in [column_widths, column_offsets, extents.width,
+                    extents.height]:
+        array_i.flags.writeable = False
+    layout = TableLayout(font, column_extents, column_widths, column_offsets,
+                         row_height, width, row_height * row_count)
+    _fit_cache.put(key, layout._replace(font=font.copy()))
+    return layout
+
+
+def _limits_key(limits):
+    '''
+    Returns
+    -------
+    tuple or None
+        Hashable column width limits (see :func:`layout_table`).
+    '''
+    if limits is None:
+        return None
+    return tuple(np.ravel(limits).astype(float).tolist())
+
+
+def _measure_column(args):
+    '''
+    Estimate the size of each cell of a column, and measure the widest cell.
+
+    Module-level (with picklable arguments) so it may be run in a worker
+    process.
+
+    Parameters
+    ----------
+    args : tuple
+        ``(cells, font, linear, tolerance)``, where :data:`font` is a Pango
+        font description string (including the reference size).
+
+    Returns
+    -------
+    numpy.array, numpy.array, float
+        Estimated width and height of each cell per pt, and width of the
+        widest cell at the reference size (in pixels).
+    '''
+    cells, font, linear, tolerance = args
+    font = pango.FontDescription(font)
+    context = get_measurement_context(linear)
+    table = get_glyph_table(font, linear)
+    if hasattr(cells, 'categories'):
+        # Estimate (and measure) each category used by the column once.
+        categories = np.asarray(cells.categories, dtype=object).tolist()
+        codes = np.asarray(cells.codes)
+        estimates = table.estimate(categories, 1)
+        used = np.unique(codes)
+        used_text = [categories[i] for i in used]
+        bounds = _width_bounds(used_text, estimates.width[used] *
+                               font.get_size() / float(pango.SCALE),
+                               tolerance, linear)
+        widest = _widest(used_text, bounds, font, context)
+        return estimates.width[codes], estimates.height[codes], widest
+    cells = list(cells)
+    estimates = table.estimate(cells, 1)
+    bounds = _width_bounds(cells, estimates.width * font.get_size() /
+                           float(pango.SCALE), tolerance, linear)
+    widest = _widest(cells, bounds, font, context)
+    return estimates.width, estimates.height, widest
+
+
+def _candidates(chunks, font, context, tolerance):
+    '''
+    Collect the cells of each column that may be the widest in the column.
+
+    Parameters
+    ----------
+    chunks : iterable
+        Chunks of rows, each as a list of columns (list-like of strings).
+
+    Returns
+    -------
+    list, int
+        Candidate cells of each column, and total number of rows.
+
+        Only cells with an upper bound width (see :func:`_width_bounds`) of
+        at least the width of the widest measured cell in the column are kept,
+        so memory is bounded by the number of near-widest cells rather than
+        the number of rows.
+    '''
+    table = get_glyph_table(font, context.linear)
+    size = font.get_size() / float(pango.SCALE)
+    candidates = None
+    row_count = 0
+    for chunk_i in chunks:
+        chunk_i = [list(column_j) for column_j in chunk_i]
+        if candidates is None:
+            candidates = [[] for column_j in chunk_i]
+        row_count += max([len(column_j) for column_j in chunk_i] or [0])
+        for j, column_j in enumerate(chunk_i):
+            cells_j = candidates[j] + column_j
+            bounds_j = _width_bounds(cells_j,
+                                     table.estimate(cells_j, size).width,
+                                     tolerance, context.linear)
+            widest_j = _widest(cells_j, bounds_j, font, context)
+            keep_j = np.flatnonzero(bounds_j >= widest_j)
+            candidates[j] = [cells_j[k] for k in keep_j]
+    return candidates or [], row_count
+
+
+def draw_table(context, table, align='left', column_padding=.1, linear=None,
+               columns=None):
+    '''
+    Draw a table layout in a single pass.
+
+    All cells are drawn (row by row) using a single Pango layout: the text of
+    each cell is set on the layout, and the layout is shown at the precomputed
+    cell offset (i.e., glyphs are drawn the same as by
+    :func:`render_text`, and memory does not grow with the number of cells).
+
+    Parameters
+    ----------
+    context : cairo.Context
+        Cairo context to draw on, with the source color set to the text color.
+        The table is drawn at the current origin.
+    table : TableLayout
+        Table layout (see :func:`layout_table`).
+    align : str, optional
+        Text alignment within each column.  One of `left`, `center`, `right`.
+    column_padding : float, optional
+        Fraction of each column width reserved for padding (same as passed to
+        :func:`layout_table`).
+    linear : bool, optional
+        If ``True``, draw text in linear metrics mode (see
+        :func:`set_linear_metrics`).
+
+        If not specified, use the default linear metrics mode.
+    columns : list, optional
+        Text of each column to draw using the font and column offsets of
+        :data:`table` (e.g., one page of a larger table).
+
+        If not specified, draw the cells of :data:`table`.
+    '''
+    if columns is None:
+        columns = [extents_i.text for extents_i in table.extents]
+    linear = _resolve_linear(linear)
+    if linear:
+        context.set_font_options(_linear_font_options())
+    pangocairo_context = pangocairo.CairoContext(context)
+    pangocairo_context.set_antialias(cairo.ANTIALIAS_DEFAULT)
+    layout = pangocairo_context.create_layout()
+    if linear:
+        _apply_linear_metrics(layout)
+    layout.set_font_description(table.font)
+
+    column_widths = table.column_widths / (1 + column_padding)
+    line_height = int(table.line_height)
+    row_count = max([len(column_i) for column_i in columns] or [0])
+    for row_i in xrange(row_count):
+        y_i = row_i * line_height
+        for column_j, width_j, offset_j in zip(columns, column_widths,
+                                               table.column_offsets):
+            if row_i >= len(column_j):
+                continue
+            layout.set_text(column_j[row_i])
+            x_j = offset_j
+            if align in ('center', 'right'):
+                slack_j = width_j - layout.get_size()[0] / float(pango.SCALE)
+                x_j += .5 * slack_j if align == 'center' else slack_j
+            context.move_to(x_j, y_i)
+            pangocairo_context.show_layout(layout)
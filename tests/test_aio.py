@@ -0,0 +1,104 @@
+# coding: utf-8
+import docket
+import nose
+import nose.tools
+import numpy as np
+
+
+def _asyncio():
+    try:
+        import asyncio
+    except ImportError:
+        try:
+            import trollius as asyncio
+        except ImportError:
+            raise nose.SkipTest('asyncio (or trollius) is not available.')
+    return asyncio
+
+
+def test_render_text_async():
+    from docket.util import to_array
+
+    asyncio = _asyncio()
+    loop = asyncio.new_event_loop()
+    try:
+        renderer = docket.AsyncRenderer(concurrency=2, loop=loop)
+        texts = ['hello, world!', 'goodbye', 'AVAVAV WWW']
+        futures = [renderer.render_text(text_i, width=200, font='Serif')
+                   for text_i in texts]
+        results = [loop.run_until_complete(future_i)
+                   for future_i in futures]
+    finally:
+        loop.close()
+    for text_i, (shape_i, surface_i) in zip(texts, results):
+        shape_j, surface_j = docket.render_text(text_i, width=200,
+                                                font='Serif')
+        np.testing.assert_array_equal(shape_i, shape_j)
+        np.testing.assert_array_equal(to_array(surface_i),
+                                      to_array(surface_j))
+
+
+def test_render_text_async_pending_limit():
+    asyncio = _asyncio()
+    loop = asyncio.new_event_loop()
+    try:
+        renderer = docket.AsyncRenderer(concurrency=1, max_pending=1,
+                                        loop=loop)
+        running = renderer.render_text('a')
+        pending = renderer.render_text('b')
+        nose.tools.assert_raises(asyncio.QueueFull, renderer.render_text,
+                                 'c')
+
+        # Cancelled request is never rendered, and frees its place.
+        pending.cancel()
+        nose.tools.assert_equal(renderer.pending, 0)
+        last = renderer.render_text('c')
+        loop.run_until_complete(last)
+        nose.tools.assert_true(running.done())
+        nose.tools.assert_true(pending.cancelled())
+    finally:
+        loop.close()
+
+
+def test_render_batch_async():
+    asyncio = _asyncio()
+    texts = ['hello, world!', ['goodbye', 'world'], 'AVAVAV WWW'] * 5
+    expected = list(docket.render_batch(texts, width=300, font='Serif'))
+
+    loop = asyncio.new_event_loop()
+    try:
+        renderer = docket.AsyncRenderer(concurrency=2, loop=loop)
+        queue, done = renderer.render_batch(iter(texts), chunksize=2,
+                                            maxsize=3, width=300,
+                                            font='Serif')
+        results = []
+        while True:
+            item = loop.run_until_complete(queue.get())
+            if item is None:
+                break
+            results.append(item)
+        loop.run_until_complete(done)
+    finally:
+        loop.close()
+    nose.tools.assert_equal(len(results), len(texts))
+    for (shape_i, surface_i), (shape_j, surface_j) in zip(results,
+                                                          expected):
+        np.testing.assert_array_equal(shape_i, shape_j)
+
+
+def test_render_batch_async_iterator_error():
+    asyncio = _asyncio()
+
+    def texts():
+        for text_i in ['hello, world!', 'goodbye', 'AVAVAV WWW']:
+            yield text_i
+        raise KeyError('labels')
+
+    loop = asyncio.new_event_loop()
+    try:
+        renderer = docket.AsyncRenderer(concurrency=2, loop=loop)
+        queue, done = renderer.render_batch(texts(), chunksize=2, width=300,
+                                            font='Serif')
+        nose.tools.assert_raises(KeyError, loop.run_until_complete, done)
+    finally:
+        loop.close()
@@ -0,0 +1,125 @@
+# coding: utf-8
+import docket
+import nose.tools
+import pango
+
+
+def test_fit_largest_size():
+    text = ['hello, world!', 'goodbye!']
+    width = 300
+
+    font, df_sizes = docket.fit_text(text, font='Serif', width=width)
+    nose.tools.assert_less_equal(df_sizes.width.max(), width)
+
+    # Text does not fit at the next larger font size.
+    font.set_size(font.get_size() + 1)
+    nose.tools.assert_greater(docket.text_size(text, font).width.max(),
+                              width)
+
+
+def test_solve_font_size_iterations():
+    font = pango.FontDescription('Serif')
+    text = ['hello, world!']
+    width = 300
+
+    # Start far from the solution.
+    for size_i in (1, 1000 * pango.SCALE):
+        solution = docket.solve_font_size(text, font, width=width,
+                                          size=size_i)
+        nose.tools.assert_true(solution.fits)
+        nose.tools.assert_less_equal(solution.extents.width.max(), width)
+        nose.tools.assert_less(solution.iterations, 50)
+
+
+def test_solve_font_size_critical_lines():
+    font = pango.FontDescription('Serif')
+    text = ['AVAVAV', 'WWW', 'hello, world!', 'hello, world?', 'abc'] * 10
+
+    # With zero margin, only the widest line(s) at the initial estimate are
+    # critical; the verification pass must still find the same solution.
+    solutions = [docket.solve_font_size(text, font, width=300, height=40,
+                                        margin=margin_i)
+                 for margin_i in (0, .05, 1)]
+    nose.tools.assert_equal(len(set(s.size for s in solutions)), 1)
+    for solution_i in solutions:
+        nose.tools.assert_equal(len(solution_i.extents), len(text))
+
+
+def test_solve_font_size_linear():
+    font = pango.FontDescription('Serif')
+    text = ['hello, world!', 'goodbye!']
+    width = 300
+
+    solution = docket.solve_font_size(text, font, width=width, linear=True)
+    nose.tools.assert_true(solution.fits)
+    # Initial measurement and verification of solved size (plus, possibly, a
+    # single step down if the solved size overflows due to rounding).
+    nose.tools.assert_less_equal(solution.iterations, 4)
+
+    font.set_size(solution.size + 1)
+    nose.tools.assert_greater(docket.measure_many(text, font, linear=True)
+                              .width.max(), width)
+
+
+def test_linear_metrics_default():
+    try:
+        docket.set_linear_metrics(True)
+        nose.tools.assert_true(docket.get_measurement_context().linear)
+        nose.tools.assert_false(docket.get_measurement_context(False).linear)
+        shape, surface = docket.render_text('hello, world!', width=300)
+        nose.tools.assert_less_equal(shape[0].magnitude, 300)
+    finally:
+        docket.set_linear_metrics(False)
+    nose.tools.assert_false(docket.get_measurement_context().linear)
+
+
+def test_fit_cache():
+    docket.clear_fit_cache()
+    text = ['hello, world!', 'goodbye!']
+
+    font, df_sizes = docket.fit_text(text, font='Serif', width=300)
+    docket.clear_extent_cache()
+    font_cached, df_sizes_cached = docket.fit_text(text, font='Serif',
+                                                   width=300)
+
+    info = docket.fit_cache_info()
+    nose.tools.assert_equal((info.hits, info.misses), (1, 1))
+    # No text was measured to produce cached result.
+    nose.tools.assert_equal(docket.extent_cache_info().misses, 0)
+    nose.tools.assert_equal(font.to_string(), font_cached.to_string())
+    nose.tools.assert_true(df_sizes.equals(df_sizes_cached))
+
+    # Different box is not a cache hit.
+    docket.fit_text(text, font='Serif', width=200)
+    nose.tools.assert_equal(docket.fit_cache_info().misses, 2)
+
+
+def test_fit_warm_start():
+    font = pango.FontDescription('Serif')
+    text = ['hello, world!']
+    solution = docket.solve_font_size(text, font, width=300)
+
+    # Starting from the solution, only the solution and the next larger size
+    # are measured (plus verification).
+    warm_solution = docket.solve_font_size(text, font, width=300,
+                                           size=solution.size, predict=False)
+    nose.tools.assert_equal(warm_solution.size, solution.size)
+    nose.tools.assert_less_equal(warm_solution.iterations, 3)
+
+    # Starting from a size that is not the solution, the solution is
+    # predicted from the sizes measured at the starting size (rather than
+    # searched for one Pango unit at a time).
+    for scale_i in (.9, 1.1):
+        warm_solution = docket.solve_font_size(text, font, width=300,
+                                               size=int(scale_i *
+                                                        solution.size),
+                                               predict=False)
+        nose.tools.assert_equal(warm_solution.size, solution.size)
+        nose.tools.assert_less_equal(warm_solution.iterations,
+                                     solution.iterations + 4)
+
+    docket.clear_fit_cache()
+    font_hint, df_sizes = docket.fit_text(text, font='Serif', width=300,
+                                          hint=solution.size /
+                                          float(pango.SCALE))
+    nose.tools.assert_equal(font_hint.get_size(), solution.size)
@@ -0,0 +1,71 @@
+# coding: utf-8
+from docket.util import to_array
+import docket
+import nose.tools
+import numpy as np
+import pandas as pd
+
+
+def test_format_column_default():
+    for series_i in (pd.Series([.1 + .2, 1., np.nan]), pd.Series([1, 2]),
+                     pd.Series(['a', None]), pd.Series([True, False]),
+                     pd.Series(pd.date_range('2020-01-02', periods=2)),
+                     pd.Series(pd.date_range('2020-01-02', periods=2,
+                                             tz='UTC')),
+                     pd.Series(pd.period_range('2020-01', periods=2,
+                                               freq='M')),
+                     pd.Series(pd.to_timedelta([1, 90], unit='s')),
+                     pd.Series([1, None], dtype='Int64')):
+        nose.tools.assert_equal(docket.format_column(series_i),
+                                series_i.map(str).tolist())
+
+
+def test_format_column_formats():
+    nose.tools.assert_equal(docket.format_column(pd.Series([1.234, 2]),
+                                                 '%.2f'), ['1.23', '2.00'])
+    dates = pd.Series(pd.to_datetime(['2020-01-02', '2021-03-04']))
+    nose.tools.assert_equal(docket.format_column(dates, '%d/%m/%Y'),
+                            ['02/01/2020', '04/03/2021'])
+    nose.tools.assert_equal(docket.format_frame(pd.DataFrame({'a': [1],
+                                                              'b': [2.5]}),
+                                                {'b': '%.0f'}),
+                            [['1'], ['2']])
+
+
+def test_format_column_categorical():
+    calls = []
+
+    def _format(value):
+        calls.append(value)
+        return value.upper()
+
+    series = pd.Series(['a', 'b', None, 'a'] * 100, dtype='category')
+    text = docket.format_column(series, _format)
+
+    # Each category is formatted once.
+    nose.tools.assert_equal(sorted(calls), ['a', 'b'])
+    nose.tools.assert_equal(np.asarray(text, dtype=object).tolist(),
+                            ['A', 'B', 'nan', 'A'] * 100)
+
+    # Formatted categories may mix UTF-8 byte strings and unicode strings.
+    series = pd.Series(['a', 'b', None, 'a'], dtype='category')
+    text = docket.format_column(series, {'a': 'caf\xc3\xa9',
+                                         'b': u'd\xe9j\xe0'}.get)
+    nose.tools.assert_equal(np.asarray(text, dtype=object).tolist(),
+                            ['caf\xc3\xa9', u'd\xe9j\xe0', 'nan',
+                             'caf\xc3\xa9'])
+
+
+def test_render_frame_categorical():
+    df_data = pd.DataFrame([['Callie', 'Ernst'],
+                            ['Polly', 'Guerrero'],
+                            ['Callie', 'Jones']],
+                           columns=['first_name', 'last_name'])
+    shape, surface = docket.render_frame_text(df_data, 600, font='Serif')
+    # Solve the layout of the categorical table (rather than hit the cache).
+    docket.clear_fit_cache()
+    shape_cat, surface_cat = \
+        docket.render_frame_text(df_data.astype('category'), 600,
+                                 font='Serif')
+    np.testing.assert_array_equal(shape, shape_cat)
+    np.testing.assert_array_equal(to_array(surface), to_array(surface_cat))
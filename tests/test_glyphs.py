@@ -0,0 +1,32 @@
+# coding: utf-8
+import docket
+import nose.tools
+import numpy as np
+
+
+def test_estimate_extents():
+    text = ['hello, world!', 'AVATAR', '', 'goodbye!']
+    estimated = docket.estimate_extents(text, 'Serif 24')
+    measured = docket.measure_many(text, 'Serif 24')
+
+    nose.tools.assert_equal(estimated.text, text)
+    np.testing.assert_allclose(estimated.width, measured.width, rtol=.15)
+    np.testing.assert_allclose(estimated.height, measured.height, rtol=.15)
+
+
+def test_glyph_table_cached():
+    table = docket.get_glyph_table('Serif 12')
+    # Font size is ignored.
+    nose.tools.assert_is(table, docket.get_glyph_table('Serif 24'))
+
+    table.estimate('hello', 12)
+    size = len(table)
+    # Characters are only measured the first time they are encountered.
+    table.estimate(['hello', 'hell'], 12)
+    nose.tools.assert_equal(len(table), size)
+
+
+def test_estimate_linear():
+    table = docket.get_glyph_table('Serif')
+    np.testing.assert_allclose(table.estimate('hello', 24).max(),
+                               2 * table.estimate('hello', 12).max())
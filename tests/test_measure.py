@@ -0,0 +1,108 @@
+# coding: utf-8
+import docket
+import nose.tools
+import numpy as np
+
+
+def test_thread_context_reused():
+    context = docket.get_measurement_context()
+    nose.tools.assert_is(context, docket.get_measurement_context())
+
+
+def test_release_context():
+    context = docket.get_measurement_context()
+    docket.release_measurement_context()
+    nose.tools.assert_true(context.closed)
+    nose.tools.assert_is_not(context, docket.get_measurement_context())
+
+
+def test_context_lifecycle():
+    with docket.MeasurementContext() as context:
+        size = context.measure('hello, world!', 'Serif 12')
+    nose.tools.assert_true(context.closed)
+    nose.tools.assert_raises(RuntimeError, context.measure, 'hello, world!',
+                             'Serif 12')
+
+    # Measured size matches size from thread measurement context.
+    np.testing.assert_array_equal(size,
+                                  docket.text_size('hello, world!',
+                                                   'Serif 12').values)
+
+
+def test_extent_cache():
+    docket.clear_extent_cache()
+    docket.text_size(['hello', 'world'], 'Serif 12')
+    docket.text_size('hello', 'Serif 12')
+    info = docket.extent_cache_info()
+    nose.tools.assert_equal(info.misses, 2)
+    nose.tools.assert_equal(info.hits, 1)
+
+    # Same font, specified differently, hits the cache.
+    docket.text_size('hello', docket.pango.FontDescription('Serif 12'))
+    nose.tools.assert_equal(docket.extent_cache_info().hits, 2)
+
+
+def test_extent_cache_eviction():
+    docket.clear_extent_cache()
+    maxsize = docket.extent_cache_info().maxsize
+    try:
+        docket.configure_extent_cache(2)
+        docket.text_size(['a', 'b', 'c'], 'Serif 12')
+        info = docket.extent_cache_info()
+        nose.tools.assert_equal(info.currsize, 2)
+        nose.tools.assert_equal(info.evictions, 1)
+    finally:
+        docket.configure_extent_cache(maxsize)
+
+
+def test_measure_many():
+    text = ['hello', 'world', 'hello, world!']
+    extents = docket.measure_many(text, 'Serif 12')
+    df_sizes = docket.text_size(text, 'Serif 12')
+
+    nose.tools.assert_equal(extents.text, text)
+    np.testing.assert_array_equal(extents.width, df_sizes.width.values)
+    np.testing.assert_array_equal(extents.height, df_sizes.height.values)
+    np.testing.assert_array_equal(extents.max(), df_sizes.max().values)
+    nose.tools.assert_true(extents.width.flags.c_contiguous)
+
+
+def test_measure_many_duplicates():
+    docket.clear_extent_cache()
+    text = ['hello', 'world', 'hello', 'hello', 'world']
+    extents = docket.measure_many(text, 'Serif 12')
+
+    # Each unique line is measured once.
+    info = docket.extent_cache_info()
+    nose.tools.assert_equal(info.misses + info.hits, 2)
+
+    nose.tools.assert_equal(extents.text, text)
+    unique_extents = docket.measure_many(['hello', 'world'], 'Serif 12')
+    np.testing.assert_array_equal(extents.width,
+                                  unique_extents.width[[0, 1, 0, 0, 1]])
+
+
+def test_measure_many_mixed_strings():
+    # UTF-8 byte strings and unicode strings are not comparable.
+    text = ['\xc3\xa9', u'b', '\xc3\xa9']
+    extents = docket.measure_many(text, 'Serif 12')
+    nose.tools.assert_equal(extents.text, text)
+    nose.tools.assert_equal(extents.width[0], extents.width[2])
+
+
+def test_layout_reused_per_font():
+    with docket.MeasurementContext() as context:
+        font = docket.pango.FontDescription('Serif 12')
+        layout = context._shared_layout(font)
+        sizes = [context.measure(text_i, font, cache=False)
+                 for text_i in ('hello', 'hello, world!')]
+        nose.tools.assert_is(layout, context._shared_layout(font))
+        nose.tools.assert_is_not(layout, context._shared_layout(
+            docket.pango.FontDescription('Serif 14')))
+
+        # Measurements using the shared layout match fresh layouts.
+        for text_i, size_i in zip(('hello', 'hello, world!'), sizes):
+            layout_i = context.layout(text_i, font)
+            np.testing.assert_array_equal(size_i,
+                                          np.array(layout_i.get_size()) /
+                                          float(docket.pango.SCALE))
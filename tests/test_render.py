@@ -41,6 +41,14 @@ def test_render_frame():
     np.testing.assert_array_almost_equal(shape, image.size, decimal=0)
     nose.tools.assert_less_equal(shape[0].magnitude, width)
 
+    # Unknown options are rejected (rather than ignored).
+    nose.tools.assert_raises(TypeError, docket.render_frame_text, df_data,
+                             600, font='Serif', colour=0)
+    nose.tools.assert_raises(TypeError, list,
+                             docket.render_frame_pages(df_data, 600,
+                                                       rows_per_page=2,
+                                                       colour=0))
+
 
 def test_render_width_pixels():
     width = 600  # Explicit width in pixels
@@ -106,3 +114,336 @@ def test_render_width_inch():
 
     # Verify rendered surface width is no greater than the target width.
     nose.tools.assert_less_equal(shape[0], width.to('pixel'))
+
+
+def test_render_single_layout():
+    from docket.util import to_array
+
+    lines = ['hello, world!', 'goodbye', 'AVAVAV WWW']
+    for align_i in ('left', 'center', 'right'):
+        shape, surface = docket.render_text(lines, width=300, align=align_i)
+        shape_single, surface_single = \
+            docket.render_text(lines, width=300, align=align_i,
+                               single_layout=True)
+        np.testing.assert_array_equal(shape, shape_single)
+
+        # Output matches per-line rendering, up to sub-pixel differences.
+        difference = np.abs(to_array(surface).astype(int) -
+                            to_array(surface_single).astype(int))
+        nose.tools.assert_less((difference > 128).mean(), .01)
+
+
+def test_render_frame_pages():
+    df_data = pd.DataFrame([['Callie', 'Ernst'],
+                            ['Polly', 'Guerrero'],
+                            ['Mildred', 'Jones'],
+                            ['Tomasa', 'Rivera'],
+                            ['Ruth', 'Ng']],
+                           columns=['first_name', 'last_name'])
+    shape, surface = docket.render_frame_text(df_data, 600, font='Serif')
+
+    # Data frame, iterable of chunks, or callable returning chunks.
+    for data_i in (df_data, [df_data.iloc[:3], df_data.iloc[3:]],
+                   lambda: (df_data.iloc[i:i + 2] for i in range(0, 5, 2))):
+        pages = list(docket.render_frame_pages(data_i, 600, rows_per_page=2,
+                                               font='Serif'))
+        nose.tools.assert_equal(len(pages), 3)
+        # Pages use the same font size as the whole table.
+        np.testing.assert_array_almost_equal(pages[0][0],
+                                             shape * [1, 2. / 5])
+        np.testing.assert_array_almost_equal(pages[-1][0],
+                                             shape * [1, 1. / 5])
+
+    # Page height determines rows per page.
+    pages = list(docket.render_frame_pages(df_data, 600,
+                                           page_height=shape[1].magnitude,
+                                           font='Serif'))
+    nose.tools.assert_equal(len(pages), 1)
+
+    # No rows, no pages.
+    for data_i in (df_data.iloc[:0], iter([df_data.iloc[:0]] * 2)):
+        pages = list(docket.render_frame_pages(data_i, 600,
+                                               page_height=shape[1]
+                                               .magnitude, font='Serif'))
+        nose.tools.assert_equal(len(pages), 0)
+
+    # Leading chunks without rows are skipped.
+    chunks = iter([df_data.iloc[:0], df_data])
+    pages = list(docket.render_frame_pages(chunks, 600,
+                                           page_height=shape[1].magnitude,
+                                           font='Serif'))
+    nose.tools.assert_equal(len(pages), 1)
+
+
+def test_render_frame_pages_stream():
+    import warnings
+
+    from docket.util import to_array
+
+    df_data = pd.DataFrame([['Callie', 'Ernst'],
+                            ['Polly', 'Guerrero'],
+                            ['Maximiliana', 'Jones'],
+                            ['Tomasa', 'Rivera']],
+                           columns=['first_name', 'last_name'])
+    pages = list(docket.render_frame_pages(df_data, 600, rows_per_page=2,
+                                           font='Serif'))
+
+    # Layout is solved from the first chunk of a stream, and re-fitted once a
+    # later chunk has a cell that is wider than its column.
+    chunks = iter([df_data.iloc[:2], df_data.iloc[2:]])
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        pages_stream = list(docket.render_frame_pages(chunks, 600,
+                                                      rows_per_page=2,
+                                                      font='Serif'))
+    nose.tools.assert_equal(len([warning_i for warning_i in caught if
+                                 'wider' in str(warning_i.message)]), 1)
+    nose.tools.assert_equal(len(pages_stream), 2)
+    nose.tools.assert_greater(pages_stream[0][0][1], pages[0][0][1])
+    np.testing.assert_array_equal(to_array(pages_stream[1][1]),
+                                  to_array(pages[1][1]))
+
+    # Later cells fit the layout solved from the first chunk (which has the
+    # widest cell of each column).
+    chunks = iter([df_data.iloc[1:3], df_data.iloc[[0, 3]]])
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        list(docket.render_frame_pages(chunks, 600, rows_per_page=2,
+                                       font='Serif'))
+    nose.tools.assert_equal(len([warning_i for warning_i in caught if
+                                 'wider' in str(warning_i.message)]), 0)
+
+
+def test_incremental_table_renderer():
+    from docket.util import to_array
+
+    df_data = pd.DataFrame([['Mildred', 'Guerrero'],
+                            ['Polly', 'Ernst'],
+                            ['Tomasa', 'Rivera'],
+                            ['Ruth', 'Ng']],
+                           columns=['first_name', 'last_name'])
+    renderer = docket.IncrementalTableRenderer(df_data.iloc[:1], 600,
+                                               font='Serif')
+
+    # Appended cells fit the existing columns, so only new rows are drawn.
+    for i in range(1, len(df_data)):
+        renderer.append(df_data.iloc[i:i + 1])
+    nose.tools.assert_equal(renderer.refits, 1)
+    shape, surface = renderer.render()
+    shape_full, surface_full = docket.render_frame_text(df_data, 600,
+                                                        font='Serif')
+    np.testing.assert_array_almost_equal(shape, shape_full)
+    np.testing.assert_array_equal(to_array(surface), to_array(surface_full))
+
+    # A wider cell triggers a re-fit.
+    df_wide = pd.DataFrame([['Maximiliana', 'Rivera']],
+                           columns=df_data.columns)
+    renderer.append(df_wide)
+    nose.tools.assert_equal(renderer.refits, 2)
+    shape, surface = renderer.render()
+    shape_full, surface_full = \
+        docket.render_frame_text(pd.concat([df_data, df_wide]), 600,
+                                 font='Serif')
+    np.testing.assert_array_equal(to_array(surface), to_array(surface_full))
+
+
+def test_render_batch():
+    from docket.util import to_array
+
+    texts = ['hello, world!', ['goodbye', 'world'], 'AVAVAV WWW', '']
+    docket.clear_fit_cache()
+    batch = docket.render_batch(texts, width=300, height=100, font='Serif')
+    nose.tools.assert_true(hasattr(batch, 'next'))
+
+    # Each label matches the label rendered separately.
+    for text_i, (shape_i, surface_i) in zip(texts, batch):
+        # Fit the label separately (rather than hit the cache).
+        docket.clear_fit_cache()
+        shape_j, surface_j = docket.render_text(text_i, width=300,
+                                                height=100, font='Serif')
+        np.testing.assert_array_equal(shape_i, shape_j)
+        np.testing.assert_array_equal(to_array(surface_i),
+                                      to_array(surface_j))
+
+    nose.tools.assert_raises(TypeError, list,
+                             docket.render_batch(texts, width=300,
+                                                 font='Serif', colour=0))
+
+
+def test_render_batch_blank():
+    # Blank labels are not limited by width, so they are rendered at the size
+    # of the font (rather than the largest possible size).
+    shape, surface = docket.render_text('hello', font='Serif 12')
+    texts = ['', ['', ''], 'hello, world!']
+    for texts_i, uniform_i in ((texts, False), (texts[:2], False),
+                               (texts[:2], True)):
+        shapes = [shape_j for shape_j, surface_j in
+                  docket.render_batch(texts_i, width=300, font='Serif 12',
+                                      uniform=uniform_i)]
+        nose.tools.assert_equal(shapes[0][1], shape[1])
+
+    # With other labels, blank labels share the fitted size.
+    shapes = [shape_j for shape_j, surface_j in
+              docket.render_batch(texts, width=300, font='Serif 12',
+                                  uniform=True)]
+    nose.tools.assert_equal(shapes[0][1], shapes[2][1])
+
+
+def test_render_batch_uniform():
+    texts = ['hello, world!', 'goodbye', 'AVAVAV WWW']
+    shapes = [shape_i for shape_i, surface_i in
+              docket.render_batch(texts, width=300, font='Serif',
+                                  uniform=True)]
+    # Same font size, so same line height for every label.
+    nose.tools.assert_equal(len(set(shape_i[1].magnitude
+                                    for shape_i in shapes)), 1)
+
+    # Font size is the largest size at which every label fits.
+    font, df_sizes = docket.fit_text(texts, 'Serif', width=300)
+    shape, surface = docket.render_text(texts[0], font=font)
+    nose.tools.assert_equal(shapes[0][1], shape[1])
+
+
+def test_render_batch_png():
+    texts = ['hello, world!', ['goodbye', 'world'], 'AVAVAV WWW'] * 3
+    expected = []
+    for shape_i, surface_i in docket.render_batch(texts, width=300,
+                                                  font='Serif'):
+        with io.BytesIO() as output:
+            surface_i.write_to_png(output)
+            expected.append((shape_i, output.getvalue()))
+
+    # Order is preserved across chunks and worker processes.
+    for processes_i in (0, 2):
+        results = list(docket.render_batch_png(texts, processes=processes_i,
+                                               chunksize=2, width=300,
+                                               font='Serif'))
+        nose.tools.assert_equal(len(results), len(texts))
+        for (shape_i, png_i), (shape_j, png_j) in zip(results, expected):
+            np.testing.assert_array_equal(shape_i, shape_j)
+            nose.tools.assert_equal(png_i, png_j)
+
+
+def test_render_batch_png_uniform():
+    texts = ['hello, world!', 'goodbye', 'AVAVAV WWW']
+    shapes = [shape_i for shape_i, surface_i in
+              docket.render_batch(texts, width=300, font='Serif',
+                                  uniform=True)]
+    results = list(docket.render_batch_png(texts, processes=0, chunksize=1,
+                                           width=300, font='Serif',
+                                           uniform=True))
+    for shape_i, (shape_j, png_j) in zip(shapes, results):
+        np.testing.assert_array_equal(shape_i, shape_j)
+
+
+def test_render_concurrent_threads():
+    import threading
+
+    from docket.util import to_array
+
+    texts = ['hello, world!', ['goodbye', 'world'], 'AVAVAV WWW', 'x'] * 4
+    font = docket.pango.FontDescription('Serif 12')
+    expected = [to_array(surface_i) for shape_i, surface_i in
+                docket.render_batch(texts, width=200, font=font)]
+    # Threads fit each label (rather than hit the cache of the batch).
+    docket.clear_fit_cache()
+
+    # Threads share the input font and the module caches, but not the cairo
+    # and Pango objects used for measurement.
+    results = {}
+
+    def render(i):
+        # Width is converted to pixels (by the shared unit registry).
+        width = 200 * docket.UREG.pixel
+        results[i] = [to_array(docket.render_text(text_j, width=width,
+                                                  font=font)[1])
+                      for text_j in texts]
+
+    # Caches are resized (changing the number of stripes) while rendering.
+    errors = []
+
+    def resize(maxsizes):
+        try:
+            while any(thread_i.is_alive() for thread_i in threads):
+                for extent_size_i, fit_size_i in maxsizes:
+                    docket.configure_extent_cache(extent_size_i)
+                    docket.configure_fit_cache(fit_size_i)
+        except Exception as exception:
+            errors.append(exception)
+
+    maxsizes = [(docket.extent_cache_info().maxsize,
+                 docket.fit_cache_info().maxsize), (64, 8)]
+    threads = [threading.Thread(target=render, args=(i, )) for i in range(4)]
+    resizer = threading.Thread(target=resize, args=(maxsizes, ))
+    try:
+        for thread_i in threads:
+            thread_i.start()
+        resizer.start()
+        for thread_i in threads + [resizer]:
+            thread_i.join()
+    finally:
+        docket.configure_extent_cache(maxsizes[0][0])
+        docket.configure_fit_cache(maxsizes[0][1])
+    nose.tools.assert_equal(errors, [])
+    nose.tools.assert_equal(font.to_string(), 'Serif 12')
+    for i in range(len(threads)):
+        for array_i, array_j in zip(results[i], expected):
+            np.testing.assert_array_equal(array_i, array_j)
+
+    results = list(docket.render_batch_threads(texts, threads=4, chunksize=3,
+                                               width=200, font=font))
+    nose.tools.assert_equal(len(results), len(texts))
+    for (shape_i, surface_i), array_j in zip(results, expected):
+        np.testing.assert_array_equal(to_array(surface_i), array_j)
+
+
+def test_render_records():
+    records = [{'id': i, 'name': name_i, 'city': city_i}
+               for i, (name_i, city_i) in
+               enumerate([('Callie', 'Toronto'), ('Polly', 'Ottawa'),
+                          # Non-ASCII text (e.g., from `json.loads`).
+                          (u'M\xfcller', u'Qu\xe9bec')] * 3)]
+    expected = [docket._png_bytes(surface_i) for shape_i, surface_i in
+                docket.render_batch([[record_i['name'], record_i['city']]
+                                     for record_i in records], width=300,
+                                    font='Serif')]
+
+    def stream():
+        for record_i in records:
+            consumed.append(record_i)
+            yield record_i
+
+    # Records are read one chunk at a time.
+    consumed = []
+    results = docket.render_records(stream(), '{name}\n{city}', key='id',
+                                    chunksize=4, width=300, font='Serif')
+    nose.tools.assert_equal(next(results), (0, expected[0]))
+    nose.tools.assert_equal(len(consumed), 4)
+    nose.tools.assert_equal(list(results), zip(range(1, len(records)),
+                                               expected[1:]))
+
+    # Data frame chunks (e.g., from `pandas.read_csv`), and list of fields.
+    df_records = pd.DataFrame(records)
+    chunks = (df_records.iloc[i:i + 2] for i in range(0, len(records), 2))
+    results = list(docket.render_records(chunks, ['name', 'city'],
+                                         chunksize=4, width=300,
+                                         font='Serif'))
+    nose.tools.assert_equal(results, zip(range(len(records)), expected))
+
+    # UTF-8 byte string values (e.g., from a CSV file).
+    import csv
+
+    output = io.BytesIO()
+    writer = csv.writer(output)
+    writer.writerow(['id', 'name', 'city'])
+    for record_i in records:
+        writer.writerow([record_i['id']] + [record_i[field_j].encode('utf-8')
+                                            for field_j in ('name', 'city')])
+    for reader_i in (lambda: csv.DictReader(io.BytesIO(output.getvalue())),
+                     lambda: pd.read_csv(io.BytesIO(output.getvalue()),
+                                         chunksize=4, encoding=None)):
+        results = list(docket.render_records(reader_i(), '{name}\n{city}',
+                                             key='id', chunksize=4,
+                                             width=300, font='Serif'))
+        nose.tools.assert_equal([png_j for key_j, png_j in results],
+                                expected)
@@ -0,0 +1,169 @@
+# coding: utf-8
+import docket
+import nose.tools
+import numpy as np
+
+
+COLUMNS = [['Callie', 'Polly', 'Mildred', 'Tomasa'],
+           ['Ernst', 'Guerrero', 'Jones', 'Rivera']]
+
+
+def test_layout_table_fits_columns():
+    width = 600
+    layout = docket.layout_table(COLUMNS, width, font='Serif')
+
+    np.testing.assert_almost_equal(layout.column_widths.sum(), width)
+    np.testing.assert_almost_equal(layout.column_offsets,
+                                   [0, layout.column_widths[0]])
+    for column_i, width_i in zip(COLUMNS, layout.column_widths / 1.1):
+        # Every cell fits its column at the fitted font size.
+        sizes_i = docket.measure_many(column_i, layout.font)
+        nose.tools.assert_less_equal(sizes_i.width.max(), width_i)
+
+
+def test_layout_table_largest_size():
+    width = 600
+    layout = docket.layout_table(COLUMNS, width, font='Serif')
+
+    # Some cell does not fit its column at the next larger font size.
+    font = layout.font.copy()
+    font.set_size(font.get_size() + 1)
+    column_widths = layout.column_widths / 1.1
+    nose.tools.assert_true(any(docket.measure_many(column_i, font).width.max()
+                               > width_i for column_i, width_i
+                               in zip(COLUMNS, column_widths)))
+
+
+def test_layout_table_height():
+    layout = docket.layout_table(COLUMNS, 600, font='Serif', height=40)
+    nose.tools.assert_less_equal(layout.height, 40)
+
+
+def test_draw_table_columns():
+    import cairo
+    from docket.util import to_array
+
+    layout = docket.layout_table(COLUMNS, 600, font='Serif')
+    surface = cairo.ImageSurface(cairo.FORMAT_RGB24, 600,
+                                 int(layout.height))
+    context = cairo.Context(surface)
+    context.set_source_rgb(1, 1, 1)
+    context.paint()
+    context.set_source_rgb(0, 0, 0)
+    docket.draw_table(context, layout, align='right')
+    surface.flush()
+
+    # Text is drawn in every column, right-aligned within the column (i.e.,
+    # not in the padding between columns).
+    ink = (to_array(surface) < 128).any(axis=-1).any(axis=0)
+    for width_i, offset_i in zip(layout.column_widths,
+                                 layout.column_offsets):
+        end_i = int(offset_i + width_i / 1.1)
+        nose.tools.assert_true(ink[end_i - 5:end_i].any())
+        nose.tools.assert_false(ink[end_i + 2:int(offset_i + width_i)].any())
+
+
+def test_layout_table_pruned_measurement():
+    # One long cell and many short cells per column.
+    columns = [['a %d' % i for i in range(1000)] + ['hello, world!'],
+               ['b %d' % i for i in range(1000)] + ['goodbye, world!']]
+    docket.clear_extent_cache()
+    layout = docket.layout_table(columns, 600, font='Serif')
+
+    # Only cells that may be the widest (or may not fit) are measured.
+    nose.tools.assert_less(docket.extent_cache_info().misses, 50)
+    for column_i, width_i in zip(columns, layout.column_widths / 1.1):
+        sizes_i = docket.measure_many(column_i, layout.font)
+        nose.tools.assert_less_equal(sizes_i.width.max(), width_i)
+
+
+def test_allocate_column_widths():
+    # Without constraints, widths are proportional to natural widths.
+    widths, scale = docket.allocate_column_widths([100, 50, 10], 320)
+    np.testing.assert_array_almost_equal(widths, [200, 100, 20])
+    nose.tools.assert_almost_equal(scale, 2)
+
+    # Narrow column is held at its minimum width, and the remaining columns
+    # share the rest of the width.
+    widths, scale = docket.allocate_column_widths([100, 50, 10], 320,
+                                                  min_widths=[0, 0, 60])
+    np.testing.assert_array_almost_equal(widths, [520 / 3., 260 / 3., 60])
+    nose.tools.assert_almost_equal(scale, 260 / 150.)
+
+    # Maximum width limits the scale, and the remaining width goes to the
+    # other columns.
+    widths, scale = docket.allocate_column_widths([100, 50, 10], 320,
+                                                  max_widths=[150, 1e3, 1e3])
+    nose.tools.assert_almost_equal(scale, 1.5)
+    nose.tools.assert_almost_equal(widths.sum(), 320)
+    nose.tools.assert_equal(widths[0], 150)
+
+    nose.tools.assert_raises(ValueError, docket.allocate_column_widths,
+                             [100, 50], 100, min_widths=60)
+
+
+def test_layout_table_min_widths():
+    columns = COLUMNS + [['1', '2', '3', '4']]
+    layout = docket.layout_table(columns, 600, font='Serif')
+    layout_min = docket.layout_table(columns, 600, font='Serif',
+                                     min_widths=[0, 0, 100])
+
+    np.testing.assert_almost_equal(layout_min.column_widths[-1] / 1.1, 100)
+    nose.tools.assert_less(layout_min.font.get_size(),
+                           layout.font.get_size())
+    for column_i, width_i in zip(columns, layout_min.column_widths / 1.1):
+        sizes_i = docket.measure_many(column_i, layout_min.font)
+        nose.tools.assert_less_equal(sizes_i.width.max(), width_i)
+
+
+def test_layout_table_executor():
+    from multiprocessing.pool import ThreadPool
+
+    layout = docket.layout_table(COLUMNS, 600, font='Serif')
+    # Solve the layout again in the executor (rather than hit the cache).
+    docket.clear_fit_cache()
+    pool = ThreadPool(2)
+    try:
+        layout_parallel = docket.layout_table(COLUMNS, 600, font='Serif',
+                                              executor=pool,
+                                              parallel_threshold=0)
+    finally:
+        pool.close()
+    nose.tools.assert_equal(docket.fit_cache_info().hits, 0)
+    nose.tools.assert_equal(layout.font.to_string(),
+                            layout_parallel.font.to_string())
+    np.testing.assert_array_equal(layout.column_widths,
+                                  layout_parallel.column_widths)
+
+
+def test_layout_table_cache():
+    import pandas as pd
+
+    df_data = pd.DataFrame(dict(zip(['first', 'last'], COLUMNS)))
+    docket.clear_fit_cache()
+    shape, surface = docket.render_frame_text(df_data, 600, font='Serif')
+    docket.clear_extent_cache()
+    shape_cached, surface_cached = docket.render_frame_text(df_data, 600,
+                                                            font='Serif')
+
+    # Repeated table is a cache hit, and no cell is measured.
+    info = docket.fit_cache_info()
+    nose.tools.assert_equal((info.hits, info.misses), (1, 1))
+    nose.tools.assert_equal(docket.extent_cache_info().misses, 0)
+    np.testing.assert_array_equal(shape, shape_cached)
+
+    # Different width is not a cache hit.
+    docket.render_frame_text(df_data, 500, font='Serif')
+    nose.tools.assert_equal(docket.fit_cache_info().misses, 2)
+
+
+def test_layout_table_rounding_error():
+    # At small sizes, hinted advances are rounded to whole pixels, so the
+    # widest cell is not the cell with the widest estimate (i.e., estimates
+    # are off by more than `tolerance`).
+    columns = [['i' * 30] * 50 + ['e' * 22], ['x', 'y']]
+    docket.clear_fit_cache()
+    layout = docket.layout_table(columns, 20, font='Serif 2')
+    for column_i, width_i in zip(columns, layout.column_widths / 1.1):
+        sizes_i = docket.measure_many(column_i, layout.font)
+        nose.tools.assert_less_equal(sizes_i.width.max(), width_i)